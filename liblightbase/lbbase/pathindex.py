@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+class StructPath(object):
+
+    """
+    The structure path holds everything that can be known about where a
+    structure lives inside the base: its parent group chain, which ancestors
+    are multivalued, its dimension, datatype and index flags. Structure paths
+    are built once by the PathIndex, so subsystems don't have to rediscover
+    them walking the base content recursively.
+    """
+
+    __slots__ = ['name', 'struct', 'path', 'parents', 'ancestors_multivalued',
+        'multivalued', 'dim', 'datatype', 'indices', 'is_rel', 'is_field',
+        'is_group', 'required']
+
+    def __init__(self, struct, parents=(), ancestors_multivalued=()):
+
+        # @property struct: The Field or Group object.
+        self.struct = struct
+
+        # @property is_field, is_group: Structure kind flags.
+        self.is_field = struct.is_field
+        self.is_group = struct.is_group
+
+        if self.is_field:
+            name = struct.name
+            multivalued = struct.multivalued
+        else:
+            name = struct.metadata.name
+            multivalued = struct.metadata.multivalued
+
+        # @property name: The structure name.
+        self.name = name
+
+        # @property parents: Tuple of parent group names, from the base root
+        # down to the structure's direct parent.
+        self.parents = tuple(parents)
+
+        # @property path: Tuple of structure names from the base root down to
+        # the structure itself.
+        self.path = self.parents + (name,)
+
+        # @property ancestors_multivalued: Tuple of booleans, one for each
+        # parent group, indicating if that group is multivalued.
+        self.ancestors_multivalued = tuple(ancestors_multivalued)
+
+        # @property multivalued: Indicates if the structure itself is
+        # multivalued.
+        self.multivalued = multivalued
+
+        # @property dim: Structure dimension, i.e. the number of list levels
+        # one must cross to reach a single value of this structure.
+        self.dim = sum(self.ancestors_multivalued) + int(multivalued)
+
+        # @property datatype: Datatype class (from lbtypes.standard) of fields,
+        # or None for groups.
+        self.datatype = struct._datatype.__schema__ if self.is_field else None
+
+        # @property indices: Tuple of index names. Empty for groups.
+        self.indices = tuple(struct.indices) if self.is_field else ()
+
+        # @property is_rel: Indicates if the field is relational.
+        self.is_rel = struct.is_rel if self.is_field else False
+
+        # @property required: Indicates if the field is required.
+        self.required = struct.required if self.is_field else False
+
+    @property
+    def parent(self):
+        """ @property parent: Direct parent group name, or None for structures
+        at base level.
+        """
+        return self.parents[-1] if self.parents else None
+
+    def __repr__(self):
+        return '<StructPath %s>' % '/'.join(self.path)
+
+
+class PathIndex(dict):
+
+    """
+    Flat index of all base structures, in the format {structure name:
+    StructPath}. It is built once per base, allowing constant-time lookup of
+    structure locations.
+    """
+
+    def __init__(self, content):
+        super(PathIndex, self).__init__()
+
+        # @property order: Structure names in base definition order (depth
+        # first).
+        self.order = [ ]
+
+        self._build(content, (), ())
+
+    def _build(self, content, parents, ancestors_multivalued):
+        for struct in content:
+            spath = StructPath(struct, parents, ancestors_multivalued)
+            self[spath.name] = spath
+            self.order.append(spath.name)
+            if spath.is_group:
+                self._build(struct.content,
+                    spath.path,
+                    spath.ancestors_multivalued + (spath.multivalued,))
+
+    @property
+    def relational_fields(self):
+        """ @property relational_fields: Dictionary at the format {field name:
+        Field} of all relational fields.
+        """
+        return {name: self[name].struct for name in self.order
+            if self[name].is_rel}
+
+    def children(self, sname=None):
+        """
+        @param sname: Group name or None for base level.
+        @return: List of StructPath objects directly under @sname.
+        """
+        return [self[name] for name in self.order
+            if self[name].parent == sname]
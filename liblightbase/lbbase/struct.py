@@ -4,7 +4,11 @@ from liblightbase import lbutils
 from liblightbase.lbutils import exc
 from liblightbase.lbbase.content import Content
 from liblightbase.lbdoc.doctree import DocumentTree
+from liblightbase.lbdoc.projection import Projection
+from liblightbase.lbdoc.converter import DocumentConverter
+from liblightbase.lbutils.cache import LRUCache
 from liblightbase.lbbase.metadata import BaseMetadata
+from liblightbase.lbbase.pathindex import PathIndex
 from liblightbase.lbdoc.metaclass import generate_metaclass
 
 class Base(object):
@@ -40,6 +44,16 @@ class Base(object):
         # relational column at database.
         self.__reldata__ = { }
 
+        # @property __pathindex__: A dictionary at the format {structname:
+        # StructPath}. Holds the location of every structure (parent chain,
+        # multivalued ancestors, dimension, datatype and indices), so it can
+        # be looked up without walking the base content.
+        self.__pathindex__ = PathIndex(self.content)
+
+        # @property __projections__: Compiled projections, in the format
+        # {frozenset of node names: Projection}. See @method projection().
+        self.__projections__ = LRUCache(128)
+
         # @property __metaclasses__: A dictionary at the format {structname:
         # metaclass}. All metaclasses are created here, so user can acces them
         # to user later, using the @method metaclass().
@@ -47,6 +61,10 @@ class Base(object):
             ._metaclass(self) for structname in self.__allstructs__}
         self.__metaclasses__['__base__'] = self._metaclass()
 
+        # @property __converter__: DocumentConverter compiled for this base,
+        # built on first use. See @property converter.
+        self.__converter__ = None
+
     @property
     def metadata(self):
         """ @property metadata getter
@@ -137,6 +155,26 @@ class Base(object):
         except KeyError:
             raise KeyError("Field %s doesn't exist on base definition." % sname)
 
+    def get_struct_path(self, sname):
+        """ 
+        @param sname: structure name to find
+        @return: StructPath
+        This method return the structure path corresponding to @sname.
+        """
+        try:
+            return self.__pathindex__[sname]
+        except KeyError:
+            raise KeyError("Field %s doesn't exist on base definition." % sname)
+
+    @property
+    def converter(self):
+        """ @property converter: Document dictionary <-> object converters
+        compiled for this base.
+        """
+        if self.__converter__ is None:
+            self.__converter__ = DocumentConverter(self)
+        return self.__converter__
+
     def metaclass(self, sname=None, valreq=True):
         """ 
         @param sname: structure name to find
@@ -170,37 +208,68 @@ class Base(object):
     def get_path(self, document, path):
         """ Get value from given path in document
         """
-        return DocumentTree(document, self).get_path(path)
+        # Reading never changes the document, so there's no need to copy it
+        return DocumentTree(document, self, inplace=True).get_path(path)
+
+    def iter_path(self, document, path, as_str=False):
+        """ Lazily iterate over (path, value) matches of given path in
+        document
+        """
+        return DocumentTree(document, self, inplace=True).iter_path(path,
+            as_str)
 
-    def set_path(self, document, path, value):
-        """ Set value from given path in document
+    def set_path(self, document, path, value, inplace=False):
+        """ Set value from given path in document. If @inplace is true, the
+        document is changed in place and returned, without being copied.
         """
-        index, document = DocumentTree(document, self, True).set_path(path, value)
-        return index, document.todict()
+        tree = DocumentTree(document, self, True, inplace)
+        index, document = tree.set_path(path, value)
+        return index, document if inplace else document.todict()
 
-    def put_path(self, document, path, value, fn=None):
-        """ Put value from given path in document
+    def put_path(self, document, path, value, fn=None, inplace=False):
+        """ Put value from given path in document. If @inplace is true, the
+        document is changed in place and returned, without being copied.
         """
-        return DocumentTree(document, self, True).put_path(path, value, fn=fn).todict()
+        document = DocumentTree(document, self, True, inplace).put_path(path,
+            value, fn=fn)
+        return document if inplace else document.todict()
 
-    def delete_path(self, document, path):
-        """ Delete value from given path in document
+    def delete_path(self, document, path, inplace=False):
+        """ Delete value from given path in document. If @inplace is true, the
+        document is changed in place and returned, without being copied.
         """
-        return DocumentTree(document, self).delete_path(path).todict()
+        document = DocumentTree(document, self, inplace=inplace)\
+            .delete_path(path)
+        return document if inplace else document.todict()
+
+    def projection(self, nodes):
+        """ 
+        @param nodes: Node names to keep.
+        This method return the compiled projection for @nodes, building it
+        only once.
+        """
+        key = frozenset(nodes)
+        projection = self.__projections__.get(key)
+        if projection is None:
+            projection = Projection(self, key)
+            self.__projections__.set(key, projection)
+        return projection
+
+    def apply_paths(self, document, operations, inplace=False):
+        """ Apply a list of path operations to document in a single pass.
+        Operations are tuples in the format ('set', path, value), ('put', path,
+        value), ('put', path, value, fn) or ('delete', path). If any of them
+        fails, the document is left untouched.
+        """
+        document = DocumentTree(document, self, True, inplace).apply(
+            operations)
+        return document if inplace else document.todict()
 
     @property
     def relational_fields(self):
         """ Get relational structures 
         """
-        rel_fields = { }
-
-        for struct in self.content:
-            if struct.is_field and struct.is_rel:
-                rel_fields[struct.name] = struct
-            elif struct.is_group:
-                rel_fields.update(struct.relational_fields)
-
-        return rel_fields
+        return self.__pathindex__.relational_fields
 
     @property
     def asdict(self):
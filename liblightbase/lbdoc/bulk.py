@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import copy
+from liblightbase.lbdoc import lbpath
+from liblightbase.lbdoc.doctree import DocumentTree
+from liblightbase.lbdoc.predicate import compile_predicate
+from liblightbase.lbutils.conv import json2base
+from liblightbase.lbutils.parallel import chunks
+from liblightbase.lbutils.parallel import make_pool
+from liblightbase.lbutils.parallel import bounded_imap
+
+class BulkPut(object):
+
+    """
+    Mass update of documents: puts a value on a path of every document
+    satisfying a predicate, like DocumentTree.put_path does for a single
+    document. Path, value and predicate are compiled once and documents are
+    changed in place.
+    """
+
+    def __init__(self, base, path, value, where=None):
+        """
+        @param base: Base object.
+        @param path: List of nodes that indicates where to put the value.
+        @param value: The value to put, as accepted by DocumentTree.put_path.
+        @param where: Predicate expression (see lbdoc.predicate) or None to
+        update all documents.
+        """
+        self.base = base
+        self.path = list(path)
+        self.value = value
+        self.where = where
+
+        # @property predicate: Compiled predicate, or None.
+        self.predicate = compile_predicate(where) if where else None
+
+        # @property total, updated: Documents read and updated.
+        self.total = 0
+        self.updated = 0
+
+        self._steps = lbpath.compile_path(self.path)
+        self._tree = DocumentTree({ }, base, create_path=True, inplace=True)
+        self._values = { }
+
+    def _value(self, match):
+        # Value conversion only depends on the structure and on the kind of
+        # the last key, so it's done once for each of them.
+        sname = lbpath.keys2sname(match.keys)
+        key = (sname, isinstance(match.key, int))
+        try:
+            value = self._values[key]
+        except KeyError:
+            value = self._values[key] = self._tree.str2lbtype(match.key,
+                self.base.get_struct_path(sname), self.value, 'put')
+        if isinstance(value, (dict, list)):
+            # Don't share containers among documents
+            return copy.deepcopy(value)
+        return value
+
+    def put(self, document):
+        """
+        @param document: Document dictionary. It's changed in place.
+        @return: True if the document was updated.
+        """
+        if self.predicate is not None and not self.predicate(document):
+            return False
+        updated = False
+        for match in list(lbpath.find(document, self._steps,
+                self._tree._create)):
+            value = self._value(match)
+            lbpath.insert(match)
+            match.container[match.key] = value
+            updated = True
+        return updated
+
+    def _put_batch(self, batch):
+        return [(self.put(document), document) for document in batch]
+
+    def apply(self, documents, workers=None, batch_size=500, processes=True):
+        """
+        @param documents: Iterable of document dictionaries. It is consumed
+        lazily.
+        @param workers: Number of parallel workers. Runs on the current
+        process if None or 1.
+        @param batch_size: Documents sent to a worker at a time.
+        @param processes: Use processes (default) or threads as workers.
+        @return: Generator of all documents, updated or not, in input order.
+        Documents updated by worker processes are copies of the input ones.
+        """
+        self.total = 0
+        self.updated = 0
+        return self._apply(documents, workers, batch_size, processes)
+
+    def _apply(self, documents, workers, batch_size, processes):
+        batches = chunks(documents, batch_size)
+        pool = None
+        if workers and workers > 1:
+            if processes:
+                pool = make_pool(workers, True, _init_worker,
+                    (self.base.json, self.path, self.value, self.where))
+                results = bounded_imap(pool, _put_batch, batches, workers * 2)
+            else:
+                pool = make_pool(workers, False)
+                results = bounded_imap(pool, self._put_batch, batches,
+                    workers * 2)
+        else:
+            results = (self._put_batch(batch) for batch in batches)
+        try:
+            for batch in results:
+                for updated, document in batch:
+                    self.total += 1
+                    self.updated += updated
+                    yield document
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+# BulkPut object owned by each worker process.
+_worker_bulkput = None
+
+def _init_worker(base_json, path, value, where):
+    global _worker_bulkput
+    _worker_bulkput = BulkPut(json2base(base_json), path, value, where)
+
+def _put_batch(batch):
+    return _worker_bulkput._put_batch(batch)
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+import re
+import keyword
+import collections
+from liblightbase.lbutils.bincodec import base_fingerprint
+
+# Field description given to datatype validators of generated modules. Values
+# are only checked, never stored as relational data.
+FieldSpec = collections.namedtuple('FieldSpec', ['name', 'required',
+    'is_rel'])
+
+class _Discard(dict):
+
+    """ Mapping whose items are new, unsaved containers. Changes are lost.
+    """
+
+    def __init__(self, factory):
+        super(_Discard, self).__init__()
+        self.factory = factory
+
+    def __getitem__(self, key):
+        return self.factory()
+
+class _ValidationBase(object):
+
+    """
+    Base given to datatype validators of generated modules. File ids and
+    relational data gathered by validators are discarded.
+    """
+
+    __files__ = _Discard(list)
+    __reldata__ = _Discard(dict)
+
+def field_validator(datatype, name, required, multivalued):
+    """
+    @param datatype: Datatype class (lbtypes.standard).
+    @param name: Field name.
+    @param required: Field required flag.
+    @param multivalued: Field multivalued flag.
+    @return: Function validating a field value, used by generated modules.
+    """
+    validate = datatype(_ValidationBase, FieldSpec(name, required, False), 0)
+    if not multivalued:
+        return validate
+
+    def validate_list(value):
+        msg = 'Expected type list for {}, but found {}'
+        assert isinstance(value, list), msg.format(name, type(value))
+        return [validate(element) for element in value]
+
+    return validate_list
+
+def check_required(document, rnames):
+    """
+    @param document: Instance of generated class.
+    @param rnames: Required structure names (attribute names).
+    """
+    missing = set(rname for rname in rnames
+        if getattr(document, rname) is None)
+    if missing:
+        raise TypeError('Required structure {} not provided'.format(missing))
+
+def class_name(name):
+    """ CamelCase python identifier for structure name
+    """
+    name = ''.join(part.capitalize() for part in re.split(r'[\W_]+', name))
+    if not name or name[0].isdigit():
+        name = 'Struct' + name
+    return name
+
+def attr_name(name):
+    """ Python identifier for structure name
+    """
+    name = re.sub(r'\W', '_', name)
+    if keyword.iskeyword(name) or name[0].isdigit():
+        name += '_'
+    return name
+
+def generate_module(base):
+    """
+    @param base: Base object.
+    @return: Source code of a python module with document classes for base.
+    Each group, and the base itself, becomes a class with __slots__ and
+    plain attributes, a from_dict classmethod, to_dict and validate
+    methods. The base definition is kept on the module, so get_base()
+    rebuilds the Base object only when needed, and FINGERPRINT allows
+    checking the module against the current base definition.
+    """
+    return _ModuleGenerator(base).generate()
+
+def write_module(base, path):
+    """
+    @param base: Base object.
+    @param path: Path of the python module file to write.
+    @return: path.
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(generate_module(base))
+    return path
+
+class _ModuleGenerator(object):
+
+    def __init__(self, base):
+        self.base = base
+        self.lines = [ ]
+        self.classes = { }
+        self.validators = [ ]
+        names = set()
+        root = class_name(base.metadata.name)
+        self.classes['__base__'] = root
+        names.add(root)
+        for sname, spath in base.__pathindex__.items():
+            if spath.is_group:
+                name = class_name(sname)
+                while name in names:
+                    name += '_'
+                names.add(name)
+                self.classes[sname] = name
+
+    def generate(self):
+        base = self.base
+        emit = self.lines.append
+        emit('# -*- coding: utf-8 -*-')
+        emit('# Document classes of base %s, generated by '
+            'liblightbase.lbdoc.codegen.' % base.metadata.name)
+        emit('# Do not edit: generate it again when the base changes.')
+        emit('from liblightbase.lbtypes import standard')
+        emit('from liblightbase.lbutils.conv import json2base')
+        emit('from liblightbase.lbutils.codecs import json2object')
+        emit('from liblightbase.lbutils.codecs import object2json')
+        emit('from liblightbase.lbdoc.metadata import DocumentMetadata')
+        emit('from liblightbase.lbdoc.codegen import check_required')
+        emit('from liblightbase.lbdoc.codegen import field_validator')
+        emit('')
+        emit('BASE_NAME = %r' % base.metadata.name)
+        emit('BASE_JSON = %r' % base.json)
+        emit('FINGERPRINT = %r' % base_fingerprint(base).hex())
+        emit('')
+        emit('_base = None')
+        emit('')
+        emit('def get_base():')
+        emit('    """ Base object, built on first call')
+        emit('    """')
+        emit('    global _base')
+        emit('    if _base is None:')
+        emit('        _base = json2base(BASE_JSON)')
+        emit('    return _base')
+        self._validators_at = len(self.lines)
+        self._class(base.content, self.classes['__base__'], True)
+        for sname, spath in base.__pathindex__.items():
+            if spath.is_group:
+                self._class(spath.struct.content, self.classes[sname],
+                    group=sname)
+        emit('')
+        emit('DOCUMENT = %s' % self.classes['__base__'])
+        emit('')
+        emit('CLASSES = {')
+        for sname, name in self.classes.items():
+            emit('    %r: %s,' % (sname, name))
+        emit('}')
+        validators = [''] + self.validators
+        self.lines[self._validators_at:self._validators_at] = validators
+        return '\n'.join(self.lines) + '\n'
+
+    def _class(self, content, name, root=False, group=None):
+        emit = self.lines.append
+        members = [ ]
+        for struct in content:
+            if struct.is_field:
+                sname = struct.name
+                attr = attr_name(sname)
+                validator = '_validate_%s' % attr
+                self.validators.append('%s = field_validator(standard.%s, '
+                    '%r, %r, %r)' % (validator,
+                    struct._datatype.__schema__.__name__, sname,
+                    bool(struct.required), bool(struct.multivalued)))
+                members.append((sname, attr, None, False, validator,
+                    struct.required))
+            else:
+                sname = struct.metadata.name
+                members.append((sname, attr_name(sname), self.classes[sname],
+                    struct.metadata.multivalued, None, False))
+        attrs = [attr for sname, attr, cls, multi, val, req in members]
+        if root:
+            attrs.append('_metadata')
+        emit('')
+        emit('class %s(object):' % name)
+        emit('')
+        emit('    """ %s of base %s' % ('Document' if root else
+            'Group %s' % group, self.base.metadata.name))
+        emit('    """')
+        emit('')
+        emit('    __slots__ = (%s)' % ''.join('%r, ' % attr
+            for attr in attrs))
+        emit('')
+        emit('    def __init__(self, %s):' % ', '.join('%s=None' % attr
+            for attr in attrs))
+        for attr in attrs:
+            emit('        self.%s = %s' % (attr, attr))
+        emit('')
+        emit('    @classmethod')
+        emit('    def from_dict(cls, dictobj):')
+        emit('        self = cls.__new__(cls)')
+        for sname, attr, cls, multivalued, validator, required in members:
+            if cls is None:
+                emit('        self.%s = dictobj.get(%r)' % (attr, sname))
+                continue
+            emit('        value = dictobj.get(%r)' % sname)
+            if multivalued:
+                emit('        self.%s = None if value is None else '
+                    '[%s.from_dict(element) for element in value]'
+                    % (attr, cls))
+            else:
+                emit('        self.%s = None if value is None else '
+                    '%s.from_dict(value)' % (attr, cls))
+        if root:
+            emit("        value = dictobj.get('_metadata')")
+            emit('        self._metadata = None if value is None else '
+                'DocumentMetadata(**value)')
+        emit('        return self')
+        emit('')
+        emit('    def to_dict(self):')
+        emit('        dictobj = { }')
+        for sname, attr, cls, multivalued, validator, required in members:
+            emit('        value = self.%s' % attr)
+            emit('        if value is not None:')
+            if cls is None:
+                emit('            dictobj[%r] = value' % sname)
+            elif multivalued:
+                emit('            dictobj[%r] = [element.to_dict() '
+                    'for element in value]' % sname)
+            else:
+                emit('            dictobj[%r] = value.to_dict()' % sname)
+        if root:
+            emit('        if self._metadata is not None:')
+            emit("            dictobj['_metadata'] = self._metadata.__dict__")
+        emit('        return dictobj')
+        emit('')
+        emit('    def validate(self):')
+        emit('        """ Check values against base definition. Raises')
+        emit('        ValidationError, TypeError or AssertionError.')
+        emit('        """')
+        rnames = [attr for sname, attr, cls, multi, val, required in members
+            if required]
+        if rnames:
+            emit('        check_required(self, %r)' % (tuple(rnames),))
+        for sname, attr, cls, multivalued, validator, required in members:
+            emit('        value = self.%s' % attr)
+            if cls is None:
+                emit('        if value is not None:')
+                emit('            %s(value)' % validator)
+            elif multivalued:
+                emit('        for element in value or ():')
+                emit('            element.validate()')
+            else:
+                emit('        if value is not None:')
+                emit('            value.validate()')
+        emit('        return self')
+        if root:
+            emit('')
+            emit('    @classmethod')
+            emit('    def from_json(cls, jsonobj):')
+            emit('        return cls.from_dict(json2object(jsonobj))')
+            emit('')
+            emit('    def to_json(self):')
+            emit('        return object2json(self.to_dict())')
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+import json
+from json.decoder import WHITESPACE
+from json.decoder import scanstring
+from json.scanner import make_scanner
+from liblightbase import lbutils
+from liblightbase.lbdoc.metadata import DocumentMetadata
+from liblightbase.lbdoc.metaclass import generate_multimetaclass
+from liblightbase.lbdoc.writer import compile_writer
+
+class DocumentConverter(object):
+
+    """
+    Converters between document dictionaries and document objects (base
+    metaclass instances), compiled once for a base. Each structure level is
+    turned into a closure holding, for every member, the slot where its
+    value is stored and the function converting it, so no structure lookup
+    or type dispatch happens per member. Values are validated exactly as when
+    set through the metaclass properties.
+    """
+
+    def __init__(self, base):
+        """
+        @param base: Base object.
+        """
+        self.base = base
+        metaclass = base.__metaclasses__['__base__']
+        self._todocument = self._compile_todocument(base.content, metaclass,
+            True)
+        self._todict = self._compile_todict(base.content, metaclass)
+        self._parse = self._compile_parser(base.content, metaclass, True)
+        self._writers = { }
+
+    def writer(self, separators=None):
+        """
+        @param separators: (item_separator, key_separator) tuple.
+        @return: Function converting a document to JSON (see
+        lbdoc.writer.compile_writer). It's compiled once per separators.
+        """
+        separators = tuple(separators or (', ', ': '))
+        try:
+            return self._writers[separators]
+        except KeyError:
+            writer = self._writers[separators] = compile_writer(self.base,
+                separators)
+            return writer
+
+    def document2json(self, document, separators=None):
+        """
+        @param document: Base metaclass instance or document dictionary.
+        @param separators: (item_separator, key_separator) tuple.
+        @return: Document JSON string, without metadata.
+        """
+        return self.writer(separators)(document)
+
+    def json2document(self, jsonobj):
+        """
+        @param jsonobj: Document JSON string.
+        @return: Base metaclass instance.
+        Document objects are built straight from the JSON text, without an
+        intermediate dictionary tree. Only field values are decoded to Python
+        objects. Like json2object, data after the document is ignored.
+        """
+        if isinstance(jsonobj, bytes):
+            jsonobj = jsonobj.decode('utf-8')
+        try:
+            return self._parse(jsonobj, _skip(jsonobj, 0))[0]
+        except IndexError:
+            raise json.JSONDecodeError('Could not parse JSON data: '
+                'unexpected end of data', jsonobj, len(jsonobj))
+
+    def dict2document(self, dictobj):
+        """
+        @param dictobj: Document dictionary. It's not changed.
+        @return: Base metaclass instance.
+        """
+        return self._todocument(dictobj)
+
+    def document2dict(self, document):
+        """
+        @param document: Base metaclass instance or document dictionary.
+        @return: Document dictionary, without metadata.
+        """
+        return self._todict(document)
+
+    def _compile_todocument(self, content, metaclass, root=False):
+        metaclasses = self.base.__metaclasses__
+        members = { }
+        for struct in content:
+            if struct.is_field:
+                sname = struct.name
+                convert = metaclasses[sname]
+            else:
+                sname = struct.metadata.name
+                convert = self._compile_todocument(struct.content,
+                    metaclasses[sname])
+                if struct.metadata.multivalued:
+                    convert = _multivalued(convert,
+                        generate_multimetaclass(struct, metaclasses[sname]))
+            members[sname] = (metaclass.__dict__['_' + sname], convert)
+        if root:
+            members['_metadata'] = (metaclass.__dict__['__metadata__'],
+                lambda value: DocumentMetadata(**value))
+        rnames = content.__rnames__
+        new = metaclass.__new__
+
+        def todocument(dictobj):
+            if rnames:
+                lbutils.validate_required(rnames, dictobj)
+            document = new(metaclass)
+            for member, value in dictobj.items():
+                try:
+                    slot, convert = members[member]
+                except KeyError:
+                    raise KeyError("Field %s doesn't exist on base definition."
+                        % member)
+                if value is None and member == '_metadata':
+                    continue
+                slot.__set__(document, convert(value))
+            return document
+
+        return todocument
+
+    def _compile_todict(self, content, metaclass):
+        metaclasses = self.base.__metaclasses__
+        members = [ ]
+        for struct in content:
+            if struct.is_field:
+                sname = struct.name
+                convert = None
+            else:
+                sname = struct.metadata.name
+                convert = self._compile_todict(struct.content,
+                    metaclasses[sname])
+                if struct.metadata.multivalued:
+                    convert = _multivalued(convert, list)
+            members.append((sname, metaclass.__dict__['_' + sname], convert))
+
+        def todict(document):
+            dictobj = { }
+            if isinstance(document, dict):
+                for sname, slot, convert in members:
+                    value = document.get(sname)
+                    if value is None:
+                        continue
+                    dictobj[sname] = value if convert is None \
+                        else convert(value)
+                return dictobj
+            for sname, slot, convert in members:
+                try:
+                    value = slot.__get__(document)
+                except AttributeError:
+                    # Structure not set
+                    continue
+                if convert is None:
+                    dictobj[sname] = value.__value__
+                else:
+                    dictobj[sname] = convert(value)
+            return dictobj
+
+        return todict
+
+    def _compile_parser(self, content, metaclass, root=False):
+        metaclasses = self.base.__metaclasses__
+        members = { }
+        for struct in content:
+            if struct.is_field:
+                sname = struct.name
+                members[sname] = (metaclass.__dict__['_' + sname],
+                    metaclasses[sname], None)
+            else:
+                sname = struct.metadata.name
+                parse = self._compile_parser(struct.content,
+                    metaclasses[sname])
+                if struct.metadata.multivalued:
+                    parse = _array_parser(parse,
+                        generate_multimetaclass(struct, metaclasses[sname]))
+                members[sname] = (metaclass.__dict__['_' + sname], None, parse)
+        if root:
+            members['_metadata'] = (metaclass.__dict__['__metadata__'],
+                lambda value: DocumentMetadata(**value), None)
+        rnames = content.__rnames__
+        new = metaclass.__new__
+
+        def parse(s, idx):
+            if s[idx] != '{':
+                raise _error('Expecting object', s, idx)
+            document = new(metaclass)
+            names = set()
+            idx = _skip(s, idx + 1)
+            if s[idx] == '}':
+                idx += 1
+            else:
+                while True:
+                    if s[idx] != '"':
+                        raise _error('Expecting property name enclosed in '
+                            'double quotes', s, idx)
+                    member, idx = scanstring(s, idx + 1)
+                    idx = _skip(s, idx)
+                    if s[idx] != ':':
+                        raise _error("Expecting ':' delimiter", s, idx)
+                    idx = _skip(s, idx + 1)
+                    try:
+                        slot, convert, parse_member = members[member]
+                    except KeyError:
+                        raise KeyError("Field %s doesn't exist on base "
+                            "definition." % member)
+                    if parse_member is None:
+                        try:
+                            value, idx = _scan_once(s, idx)
+                        except StopIteration as e:
+                            raise _error('Expecting value', s, e.value)
+                        if value is not None or member != '_metadata':
+                            slot.__set__(document, convert(value))
+                    else:
+                        value, idx = parse_member(s, idx)
+                        slot.__set__(document, value)
+                    names.add(member)
+                    idx = _skip(s, idx)
+                    if s[idx] == '}':
+                        idx += 1
+                        break
+                    if s[idx] != ',':
+                        raise _error("Expecting ',' delimiter", s, idx)
+                    idx = _skip(s, idx + 1)
+            if rnames:
+                lbutils.validate_required(rnames, names)
+            return document, idx
+
+        return parse
+
+# Scanner used to decode field values.
+_scan_once = make_scanner(json.JSONDecoder())
+
+def _skip(s, idx):
+    if s[idx:idx + 1] in ' \t\n\r':
+        idx = WHITESPACE.match(s, idx).end()
+    return idx
+
+def _error(msg, s, idx):
+    return json.JSONDecodeError('Could not parse JSON data: %s' % msg, s, idx)
+
+def _array_parser(parse, container):
+    def parse_array(s, idx):
+        if s[idx] != '[':
+            raise _error('Expecting array', s, idx)
+        elements = [ ]
+        idx = _skip(s, idx + 1)
+        if s[idx] == ']':
+            return container(elements), idx + 1
+        while True:
+            element, idx = parse(s, idx)
+            elements.append(element)
+            idx = _skip(s, idx)
+            if s[idx] == ']':
+                return container(elements), idx + 1
+            if s[idx] != ',':
+                raise _error("Expecting ',' delimiter", s, idx)
+            idx = _skip(s, idx + 1)
+    return parse_array
+
+def _multivalued(convert, container):
+    def multivalued(value):
+        return container([convert(element) for element in value])
+    return multivalued
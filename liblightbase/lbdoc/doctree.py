@@ -1,20 +1,60 @@
 
-import re
 import copy
-import jsonpath_rw
 from datetime import datetime
 from liblightbase import lbutils
+from liblightbase.lbdoc import lbpath
 from liblightbase.lbdoc.treetypes import Object
 from liblightbase.lbdoc.treetypes import Array
 
+class Journal(list):
+
+    """ 
+    Undo log of tree changes. Each entry is a tuple in the format (action,
+    container, key, old value).
+    """
+
+    NEW, SET, APPEND, DEL, REPLACE = range(5)
+
+    def rollback(self):
+        """ Undo all changes, last ones first.
+        """
+        while self:
+            action, container, key, old = self.pop()
+            if action == self.NEW:
+                del container[key]
+            elif action == self.SET:
+                container[key] = old
+            elif action == self.APPEND:
+                container.pop()
+            elif action == self.DEL:
+                if isinstance(container, list):
+                    container.insert(key, old)
+                else:
+                    container[key] = old
+            elif action == self.REPLACE:
+                container[:] = old
+
 class DocumentTree():
 
-    def __init__(self, root, base=None, create_path=False):
+    def __init__(self, root, base=None, create_path=False, inplace=False):
         self.base = base
         self.create_path = create_path
-        self.root= Object(root,
-            base=self.base,
-            create_path=self.create_path)
+
+        # @property journal: Journal of changes, used to rollback failed
+        # batches (see @method apply). None when not in a batch.
+        self.journal = None
+
+        # @property inplace: If true, @root is mutated in place instead of
+        # being wrapped (copied) into an Object. Missing structures are
+        # created as plain dicts and lists, and failed operations are rolled
+        # back (see @method apply).
+        self.inplace = inplace
+        if inplace:
+            self.root = root
+        else:
+            self.root= Object(root,
+                base=self.base,
+                create_path=self.create_path)
 
     def prune(self, root=None, nodes=[]):
         """ 
@@ -22,9 +62,13 @@ class DocumentTree():
         @param nodes: Nodes to keep after pruning (all other nodes will be 
         removed)
         @return: New tree structure pruned, or None, if no node was pruned.
+        When the tree has a base, the compiled base projection is used, and
+        kept values are shared with the tree instead of being copied.
         """
         if root is None:
             root = self.root
+            if self.base is not None:
+                return self.base.projection(nodes).project(root)
 
         if isinstance(root, dict):
             retVal = {}
@@ -50,6 +94,66 @@ class DocumentTree():
             else:
                 return None
 
+    def _create(self, sname):
+        """ 
+        @param sname: Structure name.
+        Returns an empty container for the structure, depending on it's
+        multivalued attribute.
+        """
+        multivalued = self.base.get_struct_path(sname).multivalued
+        if self.inplace:
+            return [ ] if multivalued else { }
+        elif multivalued:
+            return Array([], self.base, create_path=self.create_path)
+        else:
+            return Object({}, self.base, create_path=self.create_path)
+
+    def _setitem(self, container, key, value):
+        if self.journal is not None:
+            if isinstance(container, dict) and key not in container:
+                self.journal.append((Journal.NEW, container, key, None))
+            else:
+                self.journal.append((Journal.SET, container, key,
+                    container[key]))
+        container[key] = value
+
+    def _append(self, array, value):
+        array.append(value)
+        if self.journal is not None:
+            self.journal.append((Journal.APPEND, array, None, None))
+
+    def _delitem(self, container, key):
+        if self.journal is not None:
+            self.journal.append((Journal.DEL, container, key, container[key]))
+        del container[key]
+
+    def _filter(self, array, indexes):
+        """ Remove all @indexes from @array in a single pass.
+        """
+        if self.journal is not None:
+            self.journal.append((Journal.REPLACE, array, None, list(array)))
+        array[:] = [element for index, element in enumerate(array)
+            if index not in indexes]
+
+    def find(self, path, create_path=None):
+        """ 
+        @param path: List of nodes.
+        @param create_path: Follow missing structures. Defaults to the tree
+        create_path attribute. They're only inserted by writes (see
+        lbpath.insert).
+        @return: List of Match objects (see lbdoc.lbpath) for @path.
+        Raises IndexError if nothing matches.
+        """
+        if create_path is None:
+            create_path = self.create_path
+        create = self._create if create_path else None
+        matches = list(lbpath.find(self.root, lbpath.compile_path(path),
+            create))
+        if not matches:
+            raise IndexError('Could not find any matches for index -> %s' %
+                '/'.join(map(str, path)))
+        return matches
+
     def get_path(self, path):
         """ 
         This method traverse the tree object following the path, until
@@ -57,33 +161,27 @@ class DocumentTree():
         @ param path: List of nodes that indicates where to get the value.
         @ returns value contained in Tree indicated by path.
         """
-        jpath = self.lbpath2jpath(path)
-        matches = jpath.find(self.root)
+        matches = self.find(path)
         if len(matches) == 1:
             return matches[0].value
-        elif len(matches) > 1:
-            return {str(match.full_path): match.value for match in matches}
-        else:
-            raise IndexError('Could not find any matches for index -> %s' %
-                '/'.join(path))
-
-    def insert_on_leaf(self, branch, path, value):
-        parent = None
-        for ipath, node in enumerate(path):
-            node = self.toint(node)
-            if ipath == len(path) - 1:
-                sname = parent if isinstance(node, int) else node
-                value = self.str2lbtype(node,
-                    self.base.get_struct(sname),
-                    value)
-                break
-            parent = node
-            branch = branch[node]
-        try:
-            branch[node].append(value)
-        except AttributeError:
-            raise AttributeError('Structure %s must be array. Use PUT instead.'
-                % node)
+        return {lbpath.keys2str(match.keys): match.value for match in matches}
+
+    def iter_path(self, path, as_str=False):
+        """ 
+        This method lazily traverses the tree object following the path,
+        yielding each match as soon as it's found. Nothing is created on the
+        way, and nothing is yielded if the path does not match.
+        @ param path: List of nodes that indicates where to get the values.
+        @ param as_str: If true, match paths are yielded as jsonpath strings
+        (the get_path keys) instead of tuples.
+        @ returns generator of tuples in the format (path, value), where path
+        is the tuple of concrete keys (names and integer indexes).
+        """
+        for match in lbpath.find(self.root, lbpath.compile_path(path)):
+            if as_str:
+                yield lbpath.keys2str(match.keys), match.value
+            else:
+                yield match.keys, match.value
 
     def set_path(self, path, value):
         """ 
@@ -95,30 +193,26 @@ class DocumentTree():
         then the value may be a JSON value.
         @ returns tree structure.
         """
-        jpath = self.lbpath2jpath(path)
-        matches = jpath.find(self.root)
-        if len(matches) > 0:
-            for match in matches:
-                lbpath = self.jpath2lbpath(str(match.full_path))
-                self.insert_on_leaf(self.root, lbpath, value)
-        else:
-            raise IndexError('Could not find any matches for index -> %s' %
-                '/'.join(path))
-        return 0, self.root
+        if self.inplace and self.journal is None:
+            # Don't leave the caller's document half changed on errors
+            self.apply([('set', path, value)])
+            return 0, self.root
 
-    def update_leaf(self, branch, path, value):
-        parent = None
-        for ipath, node in enumerate(path):
-            node = self.toint(node)
-            if ipath == len(path) - 1:
-                sname = parent if isinstance(node, int) else node
-                value = self.str2lbtype(node,
-                    self.base.get_struct(sname),
-                    value, 'put')
-                break
-            branch = branch[node]
-            parent = node
-        branch[node] = value
+        for match in self.find(path):
+            _value = self.str2lbtype(match.key,
+                self.base.get_struct_path(lbpath.keys2sname(match.keys)),
+                value)
+            array = match.value
+            if match.key not in match.container:
+                array = self._create(match.key)
+            if not isinstance(array, list):
+                raise AttributeError('Structure %s must be array. Use PUT '
+                    'instead.' % match.key)
+            lbpath.insert(match, self._setitem)
+            if array is not match.value:
+                self._setitem(match.container, match.key, array)
+            self._append(array, _value)
+        return 0, self.root
 
     def put_path(self, path, value, fn=None):
         """ 
@@ -129,34 +223,27 @@ class DocumentTree():
         then the value may be a JSON value.
         @ returns tree structure.
         """
+        if self.inplace and self.journal is None:
+            # Don't leave the caller's document half changed on errors
+            return self.apply([('put', path, value, fn)])
+
         # Special treatment for metadata
         if path == ['_metadata', 'dt_idx']:
-            self.root[path[0]][path[1]] = datetime\
-                .strptime(value, '%d/%m/%Y %H:%M:%S')
+            self._setitem(self.root[path[0]], path[1], datetime\
+                .strptime(value, '%d/%m/%Y %H:%M:%S'))
             return self.root
 
-        jpath = self.lbpath2jpath(path)
-        matches = jpath.find(self.root)
-        if len(matches) > 0:
-            for match in matches:
-                if fn is not None and not fn(match.value):
-                        continue
-                lbpath = self.jpath2lbpath(str(match.full_path))
-                self.update_leaf(self.root, lbpath, value)
-        else:
-            raise IndexError('Could not find any matches for index -> %s' %
-                '/'.join(path))
+        for match in self.find(path):
+            if fn is not None and not fn(match.value):
+                continue
+            _value = self.str2lbtype(match.key,
+                self.base.get_struct_path(lbpath.keys2sname(match.keys)),
+                value, 'put')
+            lbpath.insert(match, self._setitem)
+            self._setitem(match.container, match.key, _value)
 
         return self.root
 
-    def delete_leaf(self, branch, path):
-        for ipath, node in enumerate(path):
-            node = self.toint(node)
-            if ipath == len(path) - 1:
-                break
-            branch = branch[node]
-        del branch[node]
-
     def delete_path(self, path):
         """ 
         This method traverse the tree object following the path, until
@@ -164,56 +251,72 @@ class DocumentTree():
         @ param path: List of nodes that indicates where to put the value.
         @ returns tree structure.
         """
-        jpath = self.lbpath2jpath(path)
-        matches = jpath.find(self.root)
-
-        def keyfunc(match):
-            # sort by last index descending
-            return int(str(match.full_path)[-2:-1])
-
-        if len(matches) > 0:
+        if self.inplace and self.journal is None:
+            # Don't leave the caller's document half changed on errors
+            return self.apply([('delete', path)])
 
-            if str(matches[0].full_path).endswith(']'):
-                # if it is a multivalued field have to sort because need
-                # to delete last indexes before firsts
-                matches = sorted(matches, key=keyfunc, reverse=True)
-
-            for match in matches:
-                lbpath = self.jpath2lbpath(str(match.full_path))
-                self.delete_leaf(self.root, lbpath)
-        else:
-            raise IndexError('Could not find any matches for index -> %s' %
-                '/'.join(path))
+        arrays = { }
+        for match in self.find(path, create_path=False):
+            if isinstance(match.container, list):
+                # Group array indexes by array, so each one is filtered once
+                container_id = id(match.container)
+                if container_id not in arrays:
+                    arrays[container_id] = (match.container, set())
+                arrays[container_id][1].add(match.key)
+            else:
+                self._delitem(match.container, match.key)
+        for array, indexes in arrays.values():
+            if len(indexes) == 1:
+                self._delitem(array, indexes.pop())
+            else:
+                self._filter(array, indexes)
         return self.root
 
-    def toint(self, obj):
-        try: return int(obj)
-        except: return obj
+    def apply(self, operations):
+        """ 
+        This method applies a list of path operations on the tree, in order.
+        It is atomic: if any operation fails, all previous changes are
+        rolled back and the error is raised.
+        @ param operations: List of tuples in the format ('set', path, value),
+        ('put', path, value), ('put', path, value, fn) or ('delete', path).
+        @ returns tree structure.
+        """
+        methods = {
+            'set': self.set_path,
+            'put': self.put_path,
+            'delete': self.delete_path
+        }
+        self.journal = Journal()
+        try:
+            for operation in operations:
+                try:
+                    method = methods[operation[0]]
+                except KeyError:
+                    raise ValueError('Invalid path operation: %s' %
+                        operation[0])
+                method(*operation[1:])
+        except Exception:
+            self.journal.rollback()
+            raise
+        finally:
+            self.journal = None
+        return self.root
 
-    def str2lbtype(self, node, struct, value, method=None):
-        if struct.is_group:
+    def str2lbtype(self, node, spath, value, method=None):
+        """
+        @param node: Last path node.
+        @param spath: StructPath of the structure being written.
+        @param value: String value to convert.
+        @param method: Method name ('put') or None.
+        """
+        if spath.is_group:
             _lbtype = lbutils.json2object(value)
         elif isinstance(node, int):
-            _lbtype = struct._datatype.__schema__.cast_str(value)
-        elif struct.multivalued and method == 'put':
+            _lbtype = spath.datatype.cast_str(value)
+        elif spath.multivalued and method == 'put':
             _lbtype = lbutils.json2object(value)
         elif value == 'null':
             _lbtype = None
         else:
-            _lbtype = struct._datatype.__schema__.cast_str(value)
+            _lbtype = spath.datatype.cast_str(value)
         return _lbtype
-
-    def lbpath2jpath(self, lbpath):
-        dot_notation = '.'.join(lbpath)
-        jpath_notation = re.sub(r'(^|\.)([0-9]+|\*)($|\.)',
-            r'[\2]\3', dot_notation)
-        return jsonpath_rw.parse(jpath_notation)
-
-    def jpath2lbpath(self, jpath):
-        lbpath = jpath.replace('.[', '/')\
-            .replace('].', '/')\
-            .replace('.', '/')
-        if lbpath.endswith(']'):
-            #remove last char
-            lbpath = lbpath[:-1]
-        return lbpath.split('/')
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+from collections import namedtuple
+from liblightbase.lbutils.cache import LRUCache
+from liblightbase.lbutils.const import PYSTR
+
+class Wildcard(object):
+
+    """ Path step matching every element of an array.
+    """
+
+    def __repr__(self):
+        return '*'
+
+# @property ANY: Wildcard path step ('*' node).
+ANY = Wildcard()
+
+# @property PATH_CACHE: Compiled paths, in the format {path tuple: steps}.
+# Shared by all DocumentTree instances.
+PATH_CACHE = LRUCache(512)
+
+# @property Match: A path match. @keys is the tuple of concrete keys (names
+# and integer indexes) from the root, @container is the dict or list holding
+# the matched value and @key is the value's key in @container. @missing is
+# the tuple of (container, key, new container) insertions that make @container
+# part of the tree; it's empty unless missing structures were followed (see
+# find). @value is None if @key is missing from @container.
+Match = namedtuple('Match', ['keys', 'container', 'key', 'value', 'missing'])
+
+def compile_path(path):
+    """
+    @param path: List of nodes. Each node is a structure name, an integer
+    index (int or digits string) or '*'.
+    @return: Tuple of steps: str for names, int for indexes and ANY for
+    wildcards.
+    """
+    key = tuple(path)
+    steps = PATH_CACHE.get(key)
+    if steps is None:
+        steps = tuple(_compile_node(node) for node in key)
+        PATH_CACHE.set(key, steps)
+    return steps
+
+def _compile_node(node):
+    if isinstance(node, int):
+        return node
+    if node == '*':
+        return ANY
+    if node.isdigit():
+        return int(node)
+    return node
+
+def find(root, steps, create=None):
+    """
+    @param root: Document tree (dict).
+    @param steps: Compiled path (see compile_path).
+    @param create: Callable receiving a missing structure name and returning
+    an empty container for it. If given, missing structures are followed
+    (until the first wildcard, which only matches existing elements) and the
+    last one is matched even if it's missing. Nothing is inserted on the
+    tree: insertions needed by each match are listed on its missing
+    attribute, to be made by the caller (see insert).
+    @return: Generator of Match objects, in document order.
+
+    This method walks the tree following @steps in a single pass, yielding
+    each matched value together with its parent container and key.
+    """
+    if not steps:
+        return iter(())
+    return _find(root, steps, 0, len(steps) - 1, (), create, ())
+
+def _find(container, steps, depth, last, keys, create, missing):
+    step = steps[depth]
+    if step is ANY:
+        if not isinstance(container, list):
+            return
+        nodes = range(len(container))
+        # Elements lacking structures are not changed by wildcards
+        create = None
+    elif isinstance(step, int):
+        if not isinstance(container, list) or step >= len(container):
+            return
+        nodes = (step,)
+    else:
+        if not isinstance(container, dict):
+            return
+        if step not in container:
+            if create is None:
+                return
+            if depth == last:
+                yield Match(keys + (step,), container, step, None, missing)
+            else:
+                value = create(step)
+                for match in _find(value, steps, depth + 1, last,
+                        keys + (step,), create,
+                        missing + ((container, step, value),)):
+                    yield match
+            return
+        nodes = (step,)
+    for node in nodes:
+        value = container[node]
+        if depth == last:
+            yield Match(keys + (node,), container, node, value, missing)
+        else:
+            for match in _find(value, steps, depth + 1, last, keys + (node,),
+                    create, missing):
+                yield match
+
+def insert(match, setitem=None):
+    """
+    @param match: Match object.
+    @param setitem: Callable receiving container, key and value, used to
+    make the insertions. Defaults to plain item assignment.
+    Inserts the missing structures of @match on the tree, so its container
+    can be written.
+    """
+    for container, key, value in match.missing:
+        if setitem is None:
+            container[key] = value
+        else:
+            setitem(container, key, value)
+
+def keys2str(keys):
+    """
+    @param keys: Tuple of concrete keys (see Match).
+    @return: Path string in the jsonpath notation, e.g. "a.[0].b".
+    """
+    return '.'.join(key if isinstance(key, PYSTR) else '[%i]' % key
+        for key in keys)
+
+def keys2sname(keys):
+    """
+    @param keys: Tuple of concrete keys (see Match).
+    @return: Name of the structure holding the last key.
+    """
+    for key in reversed(keys):
+        if isinstance(key, PYSTR):
+            return key
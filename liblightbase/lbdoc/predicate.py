@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+import re
+import ast
+import json
+import operator
+from liblightbase.lbdoc import lbpath
+
+# @property OPERATORS: Comparison operators accepted on predicates.
+OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda value, literal: value in literal,
+    'not in': lambda value, literal: value not in literal,
+}
+
+TOKEN = re.compile(r'''\s*(?:
+    (?P<op>==|!=|<=|>=|<|>)|
+    (?P<paren>[()])|
+    (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')|
+    (?P<list>\[[^\]]*\])|
+    (?P<word>[^\s()=!<>\[\]"']+)
+    )''', re.VERBOSE)
+
+def tokenize(expression):
+    """
+    @param expression: Predicate expression.
+    @return: List of tuples in the format (kind, text).
+    """
+    tokens = [ ]
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = TOKEN.match(expression, position)
+        if match is None or match.end() == position:
+            raise SyntaxError('Invalid predicate near: %s' %
+                expression[position:])
+        position = match.end()
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+    return tokens
+
+def compile_predicate(expression):
+    """
+    @param expression: Predicate expression. Comparisons have the form
+    "path operator literal", where path is a LB path with nodes separated by
+    "." or "/" (wildcards allowed), operator is one of ==, !=, <, <=, >, >=,
+    in and not in, and literal is a JSON literal (single quoted strings are
+    accepted too). Comparisons can be combined with and, or, not and
+    parentheses. E.g.: "categoria == 'Y' and dependente.idade_dep >= 18".
+    @return: Function receiving a document dictionary and returning a
+    boolean. A comparison is true if any value matched by path satisfies it.
+    """
+    parser = _Parser(tokenize(expression))
+    predicate = parser.parse_or()
+    if parser.tokens:
+        raise SyntaxError('Unexpected token on predicate: %s' %
+            parser.tokens[0][1])
+    return predicate
+
+class _Parser(object):
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def peek(self):
+        return self.tokens[0] if self.tokens else (None, None)
+
+    def pop(self):
+        if not self.tokens:
+            raise SyntaxError('Unexpected end of predicate.')
+        return self.tokens.pop(0)
+
+    def parse_or(self):
+        terms = [self.parse_and()]
+        while self.peek() == ('word', 'or'):
+            self.pop()
+            terms.append(self.parse_and())
+        if len(terms) == 1:
+            return terms[0]
+        return lambda document: any(term(document) for term in terms)
+
+    def parse_and(self):
+        factors = [self.parse_not()]
+        while self.peek() == ('word', 'and'):
+            self.pop()
+            factors.append(self.parse_not())
+        if len(factors) == 1:
+            return factors[0]
+        return lambda document: all(factor(document) for factor in factors)
+
+    def parse_not(self):
+        if self.peek() == ('word', 'not'):
+            self.pop()
+            factor = self.parse_not()
+            return lambda document: not factor(document)
+        if self.peek() == ('paren', '('):
+            self.pop()
+            expression = self.parse_or()
+            if self.pop() != ('paren', ')'):
+                raise SyntaxError('Missing ) on predicate.')
+            return expression
+        return self.parse_comparison()
+
+    def parse_comparison(self):
+        kind, path = self.pop()
+        if kind != 'word':
+            raise SyntaxError('Expected path on predicate, found %s' % path)
+        kind, op = self.pop()
+        if (kind, op) == ('word', 'not') and self.peek() == ('word', 'in'):
+            self.pop()
+            op = 'not in'
+        elif kind != 'op' and (kind, op) != ('word', 'in'):
+            raise SyntaxError('Expected operator on predicate, found %s' % op)
+        literal = self.parse_literal()
+        return _comparison(path, OPERATORS[op], literal)
+
+    def parse_literal(self):
+        kind, text = self.pop()
+        if kind == 'string' and text.startswith("'"):
+            return re.sub(r"\\(.)", r'\1', text[1:-1])
+        try:
+            # Strict parsing: trailing text is an error
+            return json.loads(text)
+        except ValueError:
+            pass
+        try:
+            if kind == 'list':
+                # Lists of single quoted strings, for instance
+                return ast.literal_eval(text)
+        except Exception:
+            pass
+        raise SyntaxError('Invalid literal on predicate: %s' % text)
+
+def _comparison(path, compare, literal):
+    steps = lbpath.compile_path(re.split(r'[./]', path))
+
+    def comparison(document):
+        for match in lbpath.find(document, steps):
+            try:
+                if compare(match.value, literal):
+                    return True
+            except TypeError:
+                # Values not comparable to literal
+                pass
+        return False
+
+    return comparison
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+class Projection(object):
+
+    """
+    Compiled document projection. Keeps only the given nodes (and the
+    branches leading to them) of a document, like DocumentTree.prune does.
+    The set of branches that may contain the nodes is computed once from the
+    base path index, so other branches are never visited. Kept values are
+    shared with the source document instead of being copied: callers that
+    need an independent copy must copy the result themselves.
+    """
+
+    def __init__(self, base, nodes):
+        """
+        @param base: Base object.
+        @param nodes: Node names to keep.
+        """
+        index = base.__pathindex__
+
+        # @property nodes: Node names to keep.
+        self.nodes = frozenset(nodes)
+
+        # @property branches: Names of groups that may contain kept nodes.
+        self.branches = set()
+
+        # @property generic: True if some node is not a base structure (e.g.
+        # a metadata or file attribute). Values outside known branches must
+        # then be searched too.
+        self.generic = False
+
+        for node in self.nodes:
+            spath = index.get(node)
+            if spath is None:
+                self.generic = True
+            else:
+                self.branches.update(spath.parents)
+
+    def project(self, document):
+        """
+        @param document: Document tree (dict).
+        @return: New tree structure with kept nodes only, or None, if no node
+        was kept.
+        """
+        return self._project(document, False)
+
+    def _project(self, root, generic):
+        nodes = self.nodes
+        if isinstance(root, dict):
+            branches = self.branches
+            projected = { }
+            for key, value in root.items():
+                if key in nodes:
+                    projected[key] = value
+                elif generic or key in branches:
+                    child = self._project(value, generic)
+                    if child:
+                        projected[key] = child
+                elif self.generic and isinstance(value, (dict, list)):
+                    child = self._project(value, True)
+                    if child:
+                        projected[key] = child
+            return projected or None
+        elif isinstance(root, list):
+            projected = [ ]
+            for entry in root:
+                child = self._project(entry, generic)
+                if child:
+                    projected.append(child)
+            return projected or None
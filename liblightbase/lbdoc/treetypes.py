@@ -65,10 +65,10 @@ class Object(dict):
         """ @param sname: structure name to find
             @ returns Array or Object
 
-            This method gets the base structure (Field/Group), and returns
-            a empty instance depending on structure's multivalue attribute.
+            This method gets the base structure path, and returns a empty
+            instance depending on structure's multivalue attribute.
         """
-        if self.base.get_struct(sname).multivalued:
+        if self.base.get_struct_path(sname).multivalued:
             return Array([], self.base, create_path=self.create_path)
         else:
             return Object({}, self.base, create_path=self.create_path)
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import datetime
+import functools
+from json.encoder import encode_basestring
+from liblightbase.lbtypes import standard
+from liblightbase.lbutils.codecs import DocumentJSONEncoder
+
+def _floatstr(value):
+    # Same output as json.dumps for floats
+    if value != value:
+        return 'NaN'
+    if value == float('inf'):
+        return 'Infinity'
+    if value == -float('inf'):
+        return '-Infinity'
+    return float.__repr__(value)
+
+def _strftime(format):
+    format = '"%s"' % format
+    return lambda value: value.strftime(format)
+
+_TEXT = {str: encode_basestring}
+
+# @property ENCODERS: Value encoders of each datatype, in the format
+# {datatype: {python type: function}}. Values of other types are encoded by
+# json.dumps with DocumentJSONEncoder.
+ENCODERS = {
+    standard.Text: _TEXT,
+    standard.Password: _TEXT,
+    standard.TextArea: _TEXT,
+    standard.Url: _TEXT,
+    standard.Html: _TEXT,
+    standard.Email: _TEXT,
+    standard.Integer: {int: int.__repr__},
+    standard.SelfEnumerated: {int: int.__repr__},
+    standard.Decimal: {float: _floatstr, int: int.__repr__},
+    standard.Money: {float: _floatstr, int: int.__repr__},
+    standard.Boolean: {bool: lambda value: 'true' if value else 'false'},
+    standard.Date: {str: encode_basestring,
+        datetime.date: _strftime('%d/%m/%Y')},
+    standard.Time: {str: encode_basestring,
+        datetime.time: _strftime('%H:%M:%S')},
+    standard.DateTime: {str: encode_basestring,
+        datetime.datetime: _strftime('%d/%m/%Y %H:%M:%S')},
+}
+
+def compile_writer(base, separators=None):
+    """
+    @param base: Base object.
+    @param separators: (item_separator, key_separator) tuple, like on
+    json.dumps. Defaults to (', ', ': ').
+    @return: Function receiving a document (base metaclass instance or
+    document dictionary) and returning its JSON string, the same produced by
+    json.dumps on the document dictionary (without metadata). Every field
+    encoder is chosen beforehand from the field datatype.
+    """
+    item_separator, key_separator = separators or (', ', ': ')
+    dumps = functools.partial(json.dumps, ensure_ascii=False,
+        cls=DocumentJSONEncoder, separators=(item_separator, key_separator))
+    metaclasses = base.__metaclasses__
+
+    def compile_field(spath):
+        encoders = dict(ENCODERS.get(spath.datatype, { }))
+        encoders[type(None)] = lambda value: 'null'
+        get = encoders.get
+
+        def encode(value, append):
+            encoder = get(type(value))
+            append(dumps(value) if encoder is None else encoder(value))
+
+        if not spath.struct.multivalued:
+            return encode
+
+        def encode_list(value, append):
+            if type(value) is not list:
+                append(dumps(value))
+                return
+            append('[')
+            for i, element in enumerate(value):
+                if i:
+                    append(item_separator)
+                encode(element, append)
+            append(']')
+
+        return encode_list
+
+    def compile_group(content, metaclass):
+        members = [ ]
+        for struct in content:
+            if struct.is_field:
+                sname = struct.name
+                encode = compile_field(base.get_struct_path(sname))
+            else:
+                sname = struct.metadata.name
+                encode = compile_group(struct.content, metaclasses[sname])
+                if struct.metadata.multivalued:
+                    encode = _array_writer(encode, item_separator)
+            members.append((sname, encode_basestring(sname) + key_separator,
+                metaclass.__dict__['_' + sname], struct.is_field, encode))
+
+        def write(document, append):
+            append('{')
+            first = True
+            is_dict = isinstance(document, dict)
+            for sname, key, slot, is_field, encode in members:
+                if is_dict:
+                    value = document.get(sname)
+                    if value is None:
+                        continue
+                else:
+                    try:
+                        value = slot.__get__(document)
+                    except AttributeError:
+                        # Structure not set
+                        continue
+                    if is_field:
+                        value = value.__value__
+                if first:
+                    first = False
+                else:
+                    append(item_separator)
+                append(key)
+                encode(value, append)
+            append('}')
+
+        return write
+
+    write = compile_group(base.content, metaclasses['__base__'])
+
+    def document2json(document):
+        parts = [ ]
+        write(document, parts.append)
+        return ''.join(parts)
+
+    return document2json
+
+def _array_writer(write, item_separator):
+    def write_array(value, append):
+        append('[')
+        for i, element in enumerate(value):
+            if i:
+                append(item_separator)
+            write(element, append)
+        append(']')
+    return write_array
+
+class DocumentWriter(object):
+
+    """
+    Writes documents as JSON to a text or binary stream, without building
+    the document dictionaries. Uses the writer compiled for the base (see
+    DocumentConverter.document2json).
+    """
+
+    def __init__(self, base, stream, separators=None, binary=None):
+        """
+        @param base: Base object.
+        @param stream: File-like object with a write method.
+        @param separators: (item_separator, key_separator) tuple.
+        @param binary: Whether stream takes bytes (UTF-8 is written). If
+        None, any stream that isn't a io.TextIOBase is taken as binary.
+        """
+        self.base = base
+        self.stream = stream
+        self.separators = separators
+        if binary is None:
+            binary = not isinstance(stream, io.TextIOBase)
+        self.binary = binary
+        self._document2json = base.converter.writer(separators)
+
+    def write(self, document):
+        """
+        @param document: Base metaclass instance or document dictionary.
+        """
+        text = self._document2json(document)
+        self.stream.write(text.encode('utf-8') if self.binary else text)
+
+    def write_many(self, documents, delimiter='\n'):
+        """
+        @param documents: Iterable of documents.
+        @param delimiter: Text written after each document. The default
+        writes JSON lines.
+        @return: Number of documents written.
+        """
+        write = self.stream.write
+        document2json = self._document2json
+        count = 0
+        for document in documents:
+            text = document2json(document) + delimiter
+            write(text.encode('utf-8') if self.binary else text)
+            count += 1
+        return count
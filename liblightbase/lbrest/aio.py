@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+from requests.exceptions import HTTPError
+from liblightbase import lbutils
+from liblightbase.lbrest.core import LBRest
+from liblightbase.lbbase.struct import Base
+from liblightbase.lbutils.const import PYSTR
+from liblightbase.lbutils.conv import json2base
+from liblightbase.lbutils.conv import json2document
+from liblightbase.lbsearch.search import Collection
+from liblightbase.lbsearch.search import Search
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+class AsyncResponse(object):
+
+    """
+    Response of AsyncLBRest requests, with the body already read. Has the
+    attributes of requests responses used by LBRest.
+    """
+
+    def __init__(self, response, content):
+        """
+        @param response: aiohttp.ClientResponse.
+        @param content: Response body (bytes).
+        """
+        self.status_code = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.content = content
+        self.encoding = response.get_encoding() if content else 'utf-8'
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, 'replace')
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise HTTPError('%s %s for url: %s' % (self.status_code,
+                self.reason, self.url), response=self)
+
+class AsyncLBRest(LBRest):
+
+    """
+    asyncio counterpart of LBRest, based on aiohttp. URLs are built and
+    errors reported as in LBRest, but requests are coroutines, so many of
+    them can be in flight on a single thread. Close the object (or use it
+    as an async context manager) to release connections.
+    """
+
+    def __init__(self, rest_url, response_object=False, session=None,
+            limit=100):
+        """
+        @param rest_url: The REST URL.
+        @param response_object: Return response objects from send_request.
+        Their body is already read.
+        @param session: aiohttp.ClientSession to use. If None, one is created
+        on the first request, and closed by close().
+        @param limit: Maximum concurrent connections of created session.
+        """
+        if aiohttp is None:
+            raise ImportError('aiohttp is required by the asyncio client.')
+        self.limit = limit
+        self._owns_session = session is None
+        super(AsyncLBRest, self).__init__(rest_url, response_object, session)
+
+    @property
+    def session(self):
+        """ @property session getter
+        """
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.limit))
+        return self._session
+
+    @session.setter
+    def session(self, value):
+        """ @property session setter
+        """
+        if value is not None:
+            msg = 'session must be an aiohttp.ClientSession object.'
+            assert isinstance(value, aiohttp.ClientSession), msg
+        self._session = value
+
+    async def close(self):
+        """ Close session, if it was created by this object
+        """
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def send_request(self, method, url_path=[ ], **kwargs):
+        """
+        @param method: HTTP verb.
+        @param url_path: List of URL nodes after rest_url.
+        Tries to return response text, raise HTTPError if request has gone
+        wrong.
+        """
+        response = await self.request(method, url_path, **kwargs)
+        if self.response_object:
+            # Return response object for application level error handling
+            return response
+        return self.check_response(response).text
+
+    async def request(self, method, url_path=[ ], **kwargs):
+        """
+        @param method: HTTP verb.
+        @param url_path: List of URL nodes after rest_url.
+        @param kwargs: params, data and files, like on LBRest.request.
+        Makes the http request and returns the response (AsyncResponse)
+        unchecked.
+        """
+        full_url = self.to_url(self.rest_url, *url_path)
+        files = kwargs.pop('files', None)
+        if files:
+            data = aiohttp.FormData(kwargs.pop('data', None) or { })
+            for name, value in files.items():
+                if isinstance(value, (tuple, list)):
+                    data.add_field(name, value[1], filename=value[0])
+                else:
+                    data.add_field(name, value)
+            kwargs['data'] = data
+        kwargs.pop('stream', None)
+        async with self.session.request(method, full_url,
+                cookies=self.cookies, **kwargs) as response:
+            return AsyncResponse(response, await response.read())
+
+class AsyncBaseREST(AsyncLBRest):
+
+    """
+    asyncio counterpart of BaseREST.
+    """
+
+    async def search(self, search_obj='{}'):
+        """
+        @param search_obj:
+        """
+        return await self.send_request(self.httpget,
+            data={self.search_param: search_obj})
+
+    async def get(self, base):
+        """
+        @param name: base's name
+        """
+        if isinstance(base, Base):
+            basename = base.metadata.name
+        else:
+            msg = 'Base must be Base object or string.'
+            assert isinstance(base, PYSTR), msg
+            basename = base
+        response = await self.send_request(self.httpget,
+            url_path=[basename])
+        return json2base(response)
+
+    async def create(self, base):
+        """
+        @param base:
+        """
+        return await self.send_request(self.httppost,
+            data={self.base_param: base.json})
+
+    async def update(self, base):
+        """
+        @param base:
+        """
+        return await self.send_request(self.httpput,
+            url_path=[base.metadata.name],
+            data={self.base_param: base.json})
+
+    async def delete(self, base):
+        """
+        @param base:
+        """
+        if isinstance(base, Base):
+            basename = base.metadata.name
+        else:
+            msg = 'Base must be Base object or string.'
+            assert isinstance(base, PYSTR), msg
+            basename = base
+        return await self.send_request(self.httpdelete,
+            url_path=[basename])
+
+class AsyncDocumentREST(AsyncLBRest):
+
+    """
+    asyncio counterpart of DocumentREST.
+    """
+
+    def __init__(self, rest_url, base, response_object=False, session=None,
+            limit=100):
+        """
+        @param rest_url: The REST URL.
+        @param base: Base object.
+        @param session, limit: See AsyncLBRest.
+        """
+        super(AsyncDocumentREST, self).__init__(rest_url, response_object,
+            session, limit)
+        msg = 'base must be a Base object.'
+        assert isinstance(base, Base), msg
+        self.base = base
+
+    async def get_collection(self, search_obj=None):
+        """
+        Retrieves collection of documents according to search object.
+        @param search_obj: Search object.
+        """
+        if search_obj is not None:
+            msg = 'search_obj must be a Search object.'
+            assert isinstance(search_obj, Search), msg
+        else:
+            search_obj = Search()
+        response = await self.send_request(self.httpget,
+            url_path=[self.basename, self.doc_prefix],
+            params={self.search_param: search_obj._asjson()})
+        return Collection(self.base, **lbutils.json2object(response))
+
+    async def get(self, id):
+        """
+        Retrieves document by id.
+        @param id: The document identify.
+        """
+        response = await self.send_request(self.httpget,
+            url_path=[self.basename, self.doc_prefix, str(id)])
+        return json2document(self.base, response)
+
+    async def create(self, document):
+        """
+        Creates new document.
+        @param document: Document JSON.
+        """
+        response = await self.send_request(self.httppost,
+            url_path=[self.basename, self.doc_prefix],
+            data={self.doc_param: document})
+        return int(response)
+
+    async def update(self, id, document):
+        """
+        Updates document by id.
+        @param id: The document identify.
+        @param document: Updated Document.
+        """
+        return await self.send_request(self.httpput,
+            url_path=[self.basename, self.doc_prefix, str(id)],
+            data={self.doc_param: document})
+
+    async def delete(self, id):
+        """
+        Deletes document by id.
+        @param id: The document identify.
+        """
+        return await self.send_request(self.httpdelete,
+            url_path=[self.basename, self.doc_prefix, str(id)])
+
+    async def get_path(self, id, path):
+        """
+        Retrieves given path on document.
+        @param id: The document identify.
+        @param path: List of structure names which form the path.
+        """
+        return await self.send_request(self.httpget,
+            url_path=(self.basename, self.doc_prefix, str(id))+tuple(path))
+
+    async def create_path(self, id, path, value):
+        """
+        Creates given path on document.
+        @param id: The document identify.
+        @param path: List of structure names which form the path.
+        @param value: The value to create on path.
+        """
+        return await self.send_request(self.httppost,
+            url_path=(self.basename, self.doc_prefix, str(id))+tuple(path),
+            data={self.doc_param: value})
+
+    async def update_path(self, id, path, value):
+        """
+        Updates given path on document.
+        @param id: The document identify.
+        @param path: List of structure names which form the path.
+        @param value: The value to create on path.
+        """
+        return await self.send_request(self.httpput,
+            url_path=(self.basename, self.doc_prefix, str(id))+tuple(path),
+            data={self.doc_param: value})
+
+    async def delete_path(self, id, path):
+        """
+        Deletes given path on document.
+        @param id: The document identify.
+        @param path: List of structure names which form the path.
+        """
+        return await self.send_request(self.httpdelete,
+            url_path=(self.basename, self.doc_prefix, str(id))+tuple(path))
+
+class AsyncFileREST(AsyncLBRest):
+
+    """
+    asyncio counterpart of FileREST.
+    """
+
+    def __init__(self, rest_url, base, response_object=False, session=None,
+            limit=100):
+        """
+        @param rest_url: The REST URL.
+        @param base: String or Base object.
+        @param session, limit: See AsyncLBRest.
+        """
+        super(AsyncFileREST, self).__init__(rest_url, response_object,
+            session, limit)
+        self.base = base
+
+    async def get(self, id):
+        """
+        Retrieves file by id, returning file headers and file content.
+        @param id: The file identify.
+        """
+        response = self.check_response(await self.request(
+            self.httpget, url_path=[self.basename, self.file_prefix,
+            str(id), 'download']))
+        return self.get_file_headers(response), response.content
+
+    def get_file_headers(self, response):
+        cd = response.headers['Content-Disposition']
+        return {
+            'filename': cd[cd.rfind("=") + 1:].strip(),
+            'mimetype': response.headers['Content-Type']
+        }
+
+    async def download(self, id):
+        """ Alias to @method get
+        """
+        return await self.get(id)
+
+    async def create(self, files):
+        """
+        Creates files.
+        @param files: ('name.txt', 'content\nbinary\nfile')
+        """
+        return await self.send_request(self.httppost,
+            url_path=[self.basename, self.file_prefix],
+            files={self.file_param: files})
+
+    async def upload(self, files):
+        """
+        Alias to @method create
+        @param files: ('name.txt', 'content\nbinary\nfile')
+        """
+        return await self.create(files)
@@ -10,12 +10,16 @@ class BaseREST(LBRest):
     """
     """
 
-    def __init__(self, rest_url, response_object=False):
+    def __init__(self, rest_url, response_object=False, session=None,
+            **options):
         """
         @param rest_url:
         @param basename:
+        @param session: requests.Session, see LBRest.
+        @param options: timeout, deadline, retry and breaker, see LBRest.
         """
-        super(BaseREST, self).__init__(rest_url, response_object)
+        super(BaseREST, self).__init__(rest_url, response_object, session,
+            **options)
 
     def search(self, search_obj='{}'):
         """
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import collections
+from liblightbase.lbutils.parallel import make_pool
+from liblightbase.lbutils.parallel import bounded_imap
+
+# @property BulkItem: Outcome of one item of a bulk operation. result is the
+# value returned by the REST call, or None if it failed with error.
+BulkItem = collections.namedtuple('BulkItem', ['position', 'item', 'result',
+    'error'])
+
+class BulkOperation(object):
+
+    """
+    Runs a REST call for each item of an iterable, with a bounded number of
+    requests in flight. Items are read lazily and outcomes (BulkItem) are
+    yielded in input order. Failed items don't abort the operation: their
+    error is reported on the outcome and collected on failures.
+    """
+
+    def __init__(self, func, items, workers=8, window=None):
+        """
+        @param func: Function making the REST call for one item.
+        @param items: Iterable of items.
+        @param workers: Maximum number of requests in flight. Pooled
+        sessions keep 10 connections per server by default; use
+        configure_session() to keep more.
+        @param window: Maximum number of items read ahead. Defaults to
+        twice @workers.
+        """
+        self.func = func
+        self.items = items
+        self.workers = workers
+        self.window = window or workers * 2
+
+        # @property total, succeeded: Items processed and succeeded so far.
+        self.total = 0
+        self.succeeded = 0
+
+        # @property failures: BulkItem of each failed item.
+        self.failures = [ ]
+
+    @property
+    def failed(self):
+        """ @property failed: Number of items that failed.
+        """
+        return len(self.failures)
+
+    def _call(self, args):
+        position, item = args
+        try:
+            return BulkItem(position, item, self.func(item), None)
+        except Exception as e:
+            return BulkItem(position, item, None, e)
+
+    def __iter__(self):
+        self.total = 0
+        self.succeeded = 0
+        self.failures = [ ]
+        pool = None
+        if self.workers > 1:
+            pool = make_pool(self.workers, False)
+            outcomes = bounded_imap(pool, self._call, enumerate(self.items),
+                self.window)
+        else:
+            outcomes = (self._call(args) for args in enumerate(self.items))
+        try:
+            for outcome in outcomes:
+                self.total += 1
+                if outcome.error is None:
+                    self.succeeded += 1
+                else:
+                    self.failures.append(outcome)
+                yield outcome
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+    def run(self):
+        """ Process all items, discarding outcomes. Returns self.
+        """
+        for outcome in self:
+            pass
+        return self
+
+    def __repr__(self):
+        return '<BulkOperation total=%d succeeded=%d failed=%d>' % (
+            self.total, self.succeeded, self.failed)
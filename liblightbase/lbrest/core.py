@@ -1,11 +1,101 @@
 # -*- coding: utf-8 -*-  
+import time
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
+from requests.exceptions import Timeout
 from liblightbase import lbutils
 from liblightbase.lbbase.struct import Base
 
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
 SESSION_COOKIES = None
 
+# @property SESSIONS: Pooled sessions shared by all REST objects, in the
+# format {(scheme, host, port): requests.Session}. See get_session().
+SESSIONS = { }
+_sessions_lock = threading.Lock()
+
+def session_key(rest_url):
+    """ Return (scheme, host, port) of rest_url
+    """
+    url = urlsplit(rest_url)
+    port = url.port or {'http': 80, 'https': 443}.get(url.scheme)
+    return (url.scheme, url.hostname, port)
+
+def get_session(rest_url, pool_connections=10, pool_maxsize=10,
+        pool_block=False, keep_alive=True):
+    """
+    @param rest_url: REST URL (only scheme, host and port matter).
+    @param pool_connections: Number of connection pools kept by the session.
+    @param pool_maxsize: Connections kept alive in the pool of the host.
+    @param pool_block: If True, no more than pool_maxsize concurrent
+    connections are opened to the host; requests wait for a free one.
+    @param keep_alive: If False, connections are closed after each request.
+
+    Return the pooled session of the server of rest_url, creating it with the
+    given options if there's none yet. The same session is shared by all REST
+    objects using the same server. Use configure_session() to change the
+    options of an existing session.
+    """
+    key = session_key(rest_url)
+    with _sessions_lock:
+        session = SESSIONS.get(key)
+        if session is None:
+            session = SESSIONS[key] = _make_session(key, pool_connections,
+                pool_maxsize, pool_block, keep_alive)
+        return session
+
+def configure_session(rest_url, **options):
+    """
+    @param rest_url: REST URL.
+    @param options: Options accepted by get_session().
+    Replace the session of the server of rest_url by a new one with options.
+    REST objects already created keep the session they were using.
+    """
+    key = session_key(rest_url)
+    with _sessions_lock:
+        old = SESSIONS.pop(key, None)
+    if old is not None:
+        old.close()
+    return get_session(rest_url, **options)
+
+def close_sessions():
+    """ Close and forget all pooled sessions
+    """
+    with _sessions_lock:
+        sessions = list(SESSIONS.values())
+        SESSIONS.clear()
+    for session in sessions:
+        session.close()
+
+def _make_session(key, pool_connections, pool_maxsize, pool_block,
+        keep_alive):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize, pool_block=pool_block)
+    session.mount('%s://' % key[0], adapter)
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    return session
+
+def cap_timeout(timeout, limit):
+    """
+    @param timeout: Timeout in seconds, (connect, read) tuple or None.
+    @param limit: Maximum seconds.
+    Return timeout with no value bigger than limit.
+    """
+    if timeout is None:
+        return limit
+    if isinstance(timeout, tuple):
+        return tuple(limit if value is None else min(value, limit)
+            for value in timeout)
+    return min(timeout, limit)
+
 class LBRest(object):
 
     """
@@ -36,9 +126,27 @@ class LBRest(object):
     # @property search_param:
     search_param = '$$'
 
-    def __init__(self, rest_url, response_object=False):
+    def __init__(self, rest_url, response_object=False, session=None,
+            timeout=None, deadline=None, retry=None, breaker=None):
+        """
+        @param rest_url: The REST URL.
+        @param response_object: Return response objects from send_request.
+        @param session: requests.Session to use. Defaults to the pooled
+        session of the server (see get_session()).
+        @param timeout: Default timeout of each attempt, in seconds, or a
+        (connect, read) tuple, as accepted by requests. None waits forever.
+        @param deadline: Default time limit of a request, retries included,
+        in seconds.
+        @param retry: RetryPolicy, or None to never retry.
+        @param breaker: CircuitBreaker, or None.
+        """
         self.rest_url = rest_url
         self.response_object = response_object
+        self.session = session
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retry = retry
+        self.breaker = breaker
 
     def to_url(self, *args):
         """ Make a list of args and join "/" between list elements
@@ -46,6 +154,23 @@ class LBRest(object):
         args = [arg for arg in args if arg is not None]
         return '/'.join(args)
 
+    @property
+    def session(self):
+        """ @property session getter
+        """
+        if self._session is None:
+            self._session = get_session(self.rest_url)
+        return self._session
+
+    @session.setter
+    def session(self, value):
+        """ @property session setter
+        """
+        if value is not None:
+            msg = 'session must be a requests.Session object.'
+            assert isinstance(value, requests.Session), msg
+        self._session = value
+
     @property
     def cookies(self):
         """
@@ -66,25 +191,95 @@ class LBRest(object):
         """
         @param method:
         @param path:
+        @param kwargs: See request (e.g. timeout and deadline).
         Tries to return json response, raise RequestError if exception occurs.
         """
-        # First get request method
-        request_method = getattr(requests, method.lower())
-        # Make http request
-        full_url = self.to_url(self.rest_url, *url_path)
-        response = request_method(full_url, cookies=self.cookies, **kwargs)
+        response = self.request(method, url_path, **kwargs)
         if self.response_object:
             # Return response object for application level error handling
             return response
+        # Everything is alright, return response
+        return self.check_response(response).text
+
+    def request(self, method, url_path=[ ], deadline=None, **kwargs):
+        """
+        @param method: HTTP verb.
+        @param url_path: List of URL nodes after rest_url.
+        @param deadline: Time limit of the request, retries included, in
+        seconds. Defaults to the deadline of the object.
+        @param kwargs: Arguments passed to requests (e.g. stream=True or
+        timeout, which defaults to the timeout of the object).
+        Makes the http request and returns the response object unchecked.
+        Idempotent requests are retried as told by the retry policy; the last
+        response (or error) is returned (or raised). Timeout is raised when
+        deadline expires.
+        """
+        # Make http request through the pooled session
+        full_url = self.to_url(self.rest_url, *url_path)
+        timeout = kwargs.pop('timeout', self.timeout)
+        if deadline is None:
+            deadline = self.deadline
+        expires = None if deadline is None else time.monotonic() + deadline
+        retry = self.retry
+        if retry is None or not retry.retriable(method):
+            retry = None
+        attempt = 0
+        while True:
+            if expires is None:
+                kwargs['timeout'] = timeout
+            else:
+                remaining = expires - time.monotonic()
+                if remaining <= 0:
+                    raise Timeout('Deadline of %s seconds exceeded.' %
+                        deadline)
+                kwargs['timeout'] = cap_timeout(timeout, remaining)
+            if self.breaker is not None:
+                self.breaker.allow()
+            response, error = None, None
+            try:
+                response = self.session.request(method, full_url,
+                    cookies=self.cookies, **kwargs)
+            except (requests.exceptions.ConnectionError, Timeout,
+                    requests.exceptions.ChunkedEncodingError) as e:
+                error = e
+            except BaseException:
+                # Not retried, but the breaker must know the attempt ended
+                if self.breaker is not None:
+                    self.breaker.failure()
+                raise
+            if self.breaker is not None:
+                if error is not None or \
+                        response.status_code in self.breaker.statuses:
+                    self.breaker.failure()
+                else:
+                    self.breaker.success()
+            if retry is None or attempt >= retry.retries or (error is None
+                    and response.status_code not in retry.statuses):
+                break
+            delay = retry.delay(attempt, response)
+            if expires is not None and time.monotonic() + delay >= expires:
+                # No time left for another attempt
+                break
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+        if error is not None:
+            raise error
+        return response
+
+    def check_response(self, response):
+        """
+        @param response: Response object.
+        Returns response, raise HTTPError if the request has gone wrong.
+        """
         try:
             # Check if request has gone wrong
             response.raise_for_status()
         except HTTPError:
             # Something got wrong, raise error
             raise HTTPError(response.text)
-        else:
-            # Everything is alright, return response
-            return response.text
+        return response
 
     @property
     def base(self):
@@ -1,10 +1,17 @@
 # -*- coding: utf-8 -*-
+import copy
+import collections
+from datetime import datetime
 from liblightbase.lbrest.core import LBRest
 from liblightbase.lbutils.conv import document2json
 from liblightbase.lbutils.conv import json2document
 from liblightbase.lbbase.struct import Base
 from liblightbase.lbsearch.search import Collection
+from liblightbase.lbsearch.search import StreamingCollection
 from liblightbase.lbsearch.search import Search
+from liblightbase.lbrest.bulk import BulkOperation
+from liblightbase.lbutils.parallel import make_pool
+from liblightbase.lbutils.cache import LRUCache
 from liblightbase import lbutils
 
 class DocumentREST(LBRest):
@@ -14,40 +21,178 @@ class DocumentREST(LBRest):
     http to the LighBase REST API.
     """
 
-    def __init__(self, rest_url, base, response_object=False):
+    def __init__(self, rest_url, base, response_object=False, session=None,
+            cache=None, **options):
         """
         Class constructor.
         @param rest_url: The REST URL.
         @param base: String or Base object.
+        @param session: requests.Session, see LBRest.
+        @param cache: Maximum number of documents kept by get, or an
+        LRUCache object (which may be shared among clients). No documents
+        are kept if None.
+        @param options: timeout, deadline, retry and breaker, see LBRest.
         """
-        super(DocumentREST, self).__init__(rest_url, response_object)
+        super(DocumentREST, self).__init__(rest_url, response_object, session,
+            **options)
         msg = 'base must be a Base object.'
         assert isinstance(base, Base), msg
         self.base = base
 
-    def get_collection(self, search_obj=None):
+        if cache is not None and not isinstance(cache, LRUCache):
+            cache = LRUCache(cache)
+
+        # @property cache: LRUCache of documents by (rest_url, base name, id),
+        # or None. Values are (dt_last_up, document) tuples.
+        self.cache = cache
+
+        # @property stale: Cache hits discarded because the document was
+        # changed on server since it was cached.
+        self.stale = 0
+
+    def get_collection(self, search_obj=None, stream=False,
+            chunk_size=65536):
         """
         Retrieves collection of documents according to search object.
         @param search_obj: JSON which represents a search object.
+        @param stream: If True, returns a StreamingCollection, which decodes
+        documents one at a time while the response body is read, instead of
+        loading the whole response first.
+        @param chunk_size: Bytes read at a time when streaming.
         """
         if search_obj is not None:
             msg = 'search_obj must be a Search object.'
             assert isinstance(search_obj, Search), msg
         else:
             search_obj = Search()
+        url_path = [self.basename, self.doc_prefix]
+        params = {self.search_param: search_obj._asjson()}
+        if stream:
+            response = self.check_response(self.request(self.httpget,
+                url_path=url_path, params=params, stream=True))
+            return StreamingCollection(self.base,
+                response.iter_content(chunk_size), response.close)
         response = self.send_request(self.httpget,
-            url_path=[self.basename, self.doc_prefix],
-            params={self.search_param: search_obj._asjson()})
+            url_path=url_path, params=params)
         return Collection(self.base, **lbutils.json2object(response))
 
+    def iter_collection(self, search_obj=None, page_size=None, prefetch=1):
+        """
+        Iterates over all documents matching search object, requesting one
+        page after the other while the documents of the current page are
+        being consumed.
+        @param search_obj: Search object. Its offset is where iteration
+        starts. It's not changed.
+        @param page_size: Documents per request. Defaults to search_obj
+        limit. If both are None, a single request gets all documents.
+        @param prefetch: Number of pages requested ahead, in background
+        threads.
+        @return: Generator of documents. It stops at result_count (as
+        reported by the last page).
+        """
+        if search_obj is not None:
+            msg = 'search_obj must be a Search object.'
+            assert isinstance(search_obj, Search), msg
+        else:
+            search_obj = Search()
+        if page_size is None:
+            page_size = search_obj.limit
+        return self._iter_collection(search_obj, page_size, prefetch)
+
+    def _get_page(self, search_obj, offset, page_size):
+        search_obj = copy.copy(search_obj)
+        search_obj.offset = offset
+        search_obj.limit = page_size
+        return self.get_collection(search_obj)
+
+    def _iter_collection(self, search_obj, page_size, prefetch):
+        offset = search_obj.offset
+        collection = self._get_page(search_obj, offset, page_size)
+        if page_size is None or not collection.results:
+            for document in collection.results:
+                yield document
+            return
+        pool = make_pool(prefetch, False) if prefetch > 0 else None
+        pending = collections.deque()
+        # Offset of the next page to request
+        next_offset = offset + page_size
+        result_count = collection.result_count
+        try:
+            while True:
+                while len(pending) < prefetch and next_offset < result_count:
+                    pending.append(pool.apply_async(self._get_page,
+                        (search_obj, next_offset, page_size)))
+                    next_offset += page_size
+                for document in collection.results:
+                    yield document
+                if pending:
+                    collection = pending.popleft().get()
+                elif next_offset < result_count:
+                    collection = self._get_page(search_obj, next_offset,
+                        page_size)
+                    next_offset += page_size
+                else:
+                    return
+                if not collection.results:
+                    return
+                result_count = collection.result_count
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
     def get(self, id):
         """
         Retrieves document by id.
         @param id: The document identify.
+        If there's a cache, cached documents are revalidated by requesting
+        their _metadata.dt_last_up only. They are shared among callers, so
+        they must not be changed (copy them first).
         """
-        response = self.send_request(self.httpget,
-            url_path=[self.basename, self.doc_prefix, str(id)])
-        return json2document(self.base, response)
+        if self.cache is None:
+            response = self.send_request(self.httpget,
+                url_path=[self.basename, self.doc_prefix, str(id)])
+            return json2document(self.base, response)
+        key = self._cache_key(id)
+        entry = self.cache.get(key)
+        if entry is not None:
+            try:
+                dt_last_up = self._get_text([str(id), '_metadata',
+                    'dt_last_up'])
+            except Exception:
+                self.cache.pop(key)
+                raise
+            dt_last_up = datetime.strptime(lbutils.json2object(dt_last_up),
+                '%d/%m/%Y %H:%M:%S')
+            if dt_last_up == entry[0]:
+                return entry[1]
+            self.stale += 1
+        document = json2document(self.base, self._get_text([str(id)]))
+        self.cache.set(key, (document._metadata.dt_last_up, document))
+        return document
+
+    def _get_text(self, url_path):
+        # The cache needs response text, even if response_object is set
+        response = self.request(self.httpget,
+            url_path=[self.basename, self.doc_prefix] + url_path)
+        return self.check_response(response).text
+
+    def _cache_key(self, id):
+        return (self.rest_url, self.basename, str(id))
+
+    def invalidate(self, id=None):
+        """
+        Removes document from cache. Writes made through this client do it
+        automatically.
+        @param id: The document identify. All cached documents are removed if
+        None.
+        """
+        if self.cache is None:
+            return
+        if id is None:
+            self.cache.clear()
+        else:
+            self.cache.pop(self._cache_key(id))
 
     def create(self, document):
         """
@@ -65,17 +210,64 @@ class DocumentREST(LBRest):
         @param id: The document identify.
         @param document: Updated Document.
         """
-        return self.send_request(self.httpput,
-            url_path=[self.basename, self.doc_prefix, str(id)],
-            data={self.doc_param: document})
+        try:
+            return self.send_request(self.httpput,
+                url_path=[self.basename, self.doc_prefix, str(id)],
+                data={self.doc_param: document})
+        finally:
+            self.invalidate(id)
 
     def delete(self, id):
         """
         Deletes document by id.
         @param id: The document identify.
         """
-        return self.send_request(self.httpdelete,
-            url_path=[self.base.metadata.name, self.doc_prefix, str(id)])
+        try:
+            return self.send_request(self.httpdelete,
+                url_path=[self.base.metadata.name, self.doc_prefix, str(id)])
+        finally:
+            self.invalidate(id)
+
+    def _document_data(self, document):
+        # Documents may be given as JSON, dictionaries or document objects
+        if isinstance(document, str):
+            return document
+        if isinstance(document, dict):
+            return lbutils.object2json(document)
+        return document2json(self.base, document)
+
+    def create_many(self, documents, workers=8):
+        """
+        Creates new documents, with up to @workers requests in flight.
+        @param documents: Iterable of documents (JSON, dictionaries or
+        document objects).
+        @param workers: Maximum number of requests in flight.
+        @return: BulkOperation. Iterate over it (or call run()) to send the
+        requests; results are the new document ids.
+        """
+        return BulkOperation(
+            lambda document: self.create(self._document_data(document)),
+            documents, workers)
+
+    def update_many(self, documents, workers=8):
+        """
+        Updates documents, with up to @workers requests in flight.
+        @param documents: Iterable of (id, document) tuples.
+        @param workers: Maximum number of requests in flight.
+        @return: BulkOperation, see create_many.
+        """
+        return BulkOperation(
+            lambda item: self.update(item[0], self._document_data(item[1])),
+            documents, workers)
+
+    def delete_many(self, ids, workers=8):
+        """
+        Deletes documents, with up to @workers requests in flight.
+        @param ids: Iterable of document ids.
+        @param workers: Maximum number of requests in flight.
+        @return: BulkOperation, see create_many.
+        """
+        return BulkOperation(self.delete, ids, workers)
 
     def get_path(self, id, path):
         """
@@ -93,9 +285,12 @@ class DocumentREST(LBRest):
         @param path: List of structure names which form the path.
         @param value: The value to create on path.
         """
-        return self.send_request(self.httppost,
-            url_path=(self.basename, self.doc_prefix, str(id))+tuple(path),
-            data={self.doc_param:value})
+        try:
+            return self.send_request(self.httppost,
+                url_path=(self.basename, self.doc_prefix, str(id))+tuple(path),
+                data={self.doc_param:value})
+        finally:
+            self.invalidate(id)
 
     def update_path(self, id, path, value):
         """
@@ -104,9 +299,12 @@ class DocumentREST(LBRest):
         @param path: List of structure names which form the path.
         @param value: The value to create on path.
         """
-        return self.send_request(self.httpput,
-            url_path=(self.basename, self.doc_prefix, str(id))+tuple(path),
-            data={self.doc_param:value})
+        try:
+            return self.send_request(self.httpput,
+                url_path=(self.basename, self.doc_prefix, str(id))+tuple(path),
+                data={self.doc_param:value})
+        finally:
+            self.invalidate(id)
 
     def delete_path(self, id, path):
         """
@@ -114,7 +312,9 @@ class DocumentREST(LBRest):
         @param id: The document identify.
         @param path: List of structure names which form the path.
         """
-        return self.send_request(self.httpdelete,
-            url_path=(self.basename, self.doc_prefix, str(id))+tuple(path),
-            data={self.doc_param:value})
+        try:
+            return self.send_request(self.httpdelete,
+                url_path=(self.basename, self.doc_prefix, str(id))+tuple(path))
+        finally:
+            self.invalidate(id)
 
@@ -10,13 +10,17 @@ class FileREST(LBRest):
     http to the LighBase REST API.
     """
 
-    def __init__(self, rest_url, base, response_object=False):
+    def __init__(self, rest_url, base, response_object=False, session=None,
+            **options):
         """
         Class constructor.
         @param rest_url: The REST URL.
         @param base: String or Base object.
+        @param session: requests.Session, see LBRest.
+        @param options: timeout, deadline, retry and breaker, see LBRest.
         """
-        super(FileREST, self).__init__(rest_url, response_object)
+        super(FileREST, self).__init__(rest_url, response_object, session,
+            **options)
         self.base = base
 
     def get(self, id):
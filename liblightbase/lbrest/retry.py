@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import time
+import random
+import threading
+from requests.exceptions import ConnectionError
+
+class CircuitOpenError(ConnectionError):
+
+    """
+    Raised instead of making a request while the circuit breaker of the
+    server is open.
+    """
+
+class RetryPolicy(object):
+
+    """
+    When and how long to wait before retrying a request. Only idempotent
+    verbs are retried: failed POST requests may have changed the server.
+    """
+
+    def __init__(self, retries=3, backoff=0.1, max_backoff=10.0,
+            statuses=(500, 502, 503, 504),
+            methods=('GET', 'PUT', 'DELETE', 'HEAD', 'OPTIONS')):
+        """
+        @param retries: Maximum number of retries of a request.
+        @param backoff: Base delay, in seconds. The delay before retry n is
+        a random value between 0 and backoff * 2 ** n ("full jitter").
+        @param max_backoff: Maximum delay, in seconds.
+        @param statuses: HTTP status codes retried.
+        @param methods: HTTP verbs retried.
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(methods)
+
+    def retriable(self, method):
+        """ @param method: HTTP verb.
+        """
+        return method.upper() in self.methods
+
+    def delay(self, attempt, response=None):
+        """
+        @param attempt: Number of the failed attempt, starting at 0.
+        @param response: Failed response, if any. Its Retry-After header (in
+        seconds) is honored.
+        @return: Seconds to wait before the next attempt.
+        """
+        delay = random.uniform(0, min(self.max_backoff,
+            self.backoff * 2 ** attempt))
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get('Retry-After'))
+            except (TypeError, ValueError):
+                pass
+            else:
+                delay = max(delay, min(retry_after, self.max_backoff))
+        return delay
+
+class CircuitBreaker(object):
+
+    """
+    Fails fast while a server is down. After @threshold consecutive failures
+    the circuit opens and requests raise CircuitOpenError without being made.
+    After @reset_timeout seconds one trial request is let through (the
+    circuit is half open): the circuit closes if it succeeds and opens again
+    otherwise. A breaker may be shared by all REST objects of a server.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, threshold=5, reset_timeout=30.0,
+            statuses=(502, 503, 504)):
+        """
+        @param threshold: Consecutive failures that open the circuit.
+        @param reset_timeout: Seconds the circuit stays open.
+        @param statuses: HTTP status codes counted as failures, besides
+        connection errors and timeouts.
+        """
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.statuses = frozenset(statuses)
+
+        # @property failures: Consecutive failures.
+        self.failures = 0
+
+        # @property rejected: Requests not made because circuit was open.
+        self.rejected = 0
+
+        self._state = self.CLOSED
+        self._opened = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """ @property state getter
+        """
+        with self._lock:
+            if self._state == self.OPEN and \
+                    time.monotonic() - self._opened >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """ Raise CircuitOpenError if no request may be made now.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            if time.monotonic() - self._opened >= self.reset_timeout:
+                # Let a single trial request through. If the trial never
+                # reports back, another one is let through after
+                # reset_timeout.
+                self._state = self.HALF_OPEN
+                self._opened = time.monotonic()
+                return
+            self.rejected += 1
+        raise CircuitOpenError('Circuit open: server failed %d times.' %
+            self.failures)
+
+    def success(self):
+        """ Record successful request.
+        """
+        with self._lock:
+            self.failures = 0
+            self._state = self.CLOSED
+
+    def failure(self):
+        """ Record failed request.
+        """
+        with self._lock:
+            self.failures += 1
+            if self._state == self.HALF_OPEN or \
+                    self.failures >= self.threshold:
+                self._state = self.OPEN
+                self._opened = time.monotonic()
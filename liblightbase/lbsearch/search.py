@@ -1,5 +1,6 @@
 from liblightbase import lbutils
 from liblightbase.lbutils.conv import dict2document
+from liblightbase.lbutils.jsonstream import JSONObjectStream
 
 class OrderBy(object):
     """ 
@@ -197,10 +198,54 @@ class Collection(object):
         # @property offset:
         self.offset = offset
 
+class StreamingCollection(object):
 
+    """
+    Collection whose documents are decoded while the response body is read.
+    Iterate over it (or over results) once to get the documents one at a
+    time. result_count, limit and offset are None until they are read from
+    the response, which may only happen after the last document.
+    """
 
+    def __init__(self, base, chunks, close=None):
+        """
+        @param base: Base object.
+        @param chunks: Iterable of response body chunks (str or bytes).
+        @param close: Function called when the body is exhausted or the
+        iteration is abandoned, e.g. to release the connection.
+        """
+        self.base = base
+        self._stream = JSONObjectStream(chunks, 'results')
+        self._close = close
 
+        # @property results: Generator of documents.
+        self.results = self._results()
 
+    def _results(self):
+        try:
+            for dictobj in self._stream:
+                yield dict2document(self.base, dictobj)
+        finally:
+            if self._close is not None:
+                self._close()
 
+    def __iter__(self):
+        return self.results
 
+    @property
+    def result_count(self):
+        """ @property result_count getter
+        """
+        return self._stream.members.get('result_count')
 
+    @property
+    def limit(self):
+        """ @property limit getter
+        """
+        return self._stream.members.get('limit')
+
+    @property
+    def offset(self):
+        """ @property offset getter
+        """
+        return self._stream.members.get('offset')
@@ -31,6 +31,18 @@ class FileMask(object):
             uuid = self.uuid,
         )
 
+    def make_id(self):
+        """ @return: id_file matching the other attributes of the mask. Masks
+        modified after the file was stored don't match their id_file anymore.
+        """
+        mask = self.__dict__
+        del mask['id_file']
+        try:
+            namespace = UUID(mask['uuid'])
+        except TypeError:
+            raise TypeError('%s is not a valid uuid' % mask['uuid'])
+        return str(uuid3(namespace, str(hash(frozenset(mask.items())))))
+
     @property
     def id_file(self):
         """ @property id_file getter
@@ -141,24 +153,18 @@ class FileExtension(BaseDataType):
             raise Exception(msg.format(self.field.name,
                 e))
 
-        filemask = filemask.__dict__
-        if any([filemask[v] for v in filemask]):
-
-            id_file = filemask.pop('id_file')
-            try:
-                namespace = UUID(filemask['uuid'])
-            except TypeError:
-                raise TypeError('%s is not a valid uuid' % filemask['uuid'])
+        mask = filemask.__dict__
+        if any([mask[v] for v in mask]):
 
-            name = str(hash(frozenset(filemask.items())))
+            id_file = mask.pop('id_file')
 
             try:
-                assert id_file == str(uuid3(namespace, name))
+                assert id_file == filemask.make_id()
             except AssertionError:
                 raise ValueError('Mask modified. id_file do not match file mask')
 
-            filemask['id_file'] = id_file
+            mask['id_file'] = id_file
             self.base.__files__[self.id].append(id_file)
-            return filemask
+            return mask
         else:
-            return filemask
+            return mask
@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+import re
+import struct
+import hashlib
+import datetime
+from liblightbase import lbutils
+from liblightbase.lbutils import exc
+from liblightbase.lbtypes import standard
+
+# @property MAGIC, VERSION: Format identification, at the start of every
+# encoded document, followed by the 8 bytes base fingerprint.
+MAGIC = b'LB'
+VERSION = 1
+
+# Value tags
+NULL = 0x00
+FALSE = 0x01
+TRUE = 0x02
+INT = 0x03
+FLOAT = 0x04
+STR = 0x05
+BYTES = 0x06
+LIST = 0x07
+MAP = 0x08
+GROUP = 0x09
+DATE_STR = 0x0a
+TIME_STR = 0x0b
+DATETIME_STR = 0x0c
+PACKED_INT = 0x0d
+PACKED_FLOAT = 0x0e
+DATE = 0x0f
+TIME = 0x10
+DATETIME = 0x11
+
+# Id of document metadata. Structures are numbered from 1, in path index
+# order.
+METADATA_ID = 0
+
+DATE_RE = re.compile(r'(\d\d)/(\d\d)/(\d{4})\Z', re.ASCII)
+TIME_RE = re.compile(r'(\d\d):(\d\d):(\d\d)\Z', re.ASCII)
+DATETIME_RE = re.compile(r'(\d\d)/(\d\d)/(\d{4}) (\d\d):(\d\d):(\d\d)\Z',
+    re.ASCII)
+
+def base_fingerprint(base):
+    """
+    @param base: Base object.
+    @return: 8 bytes digest of everything the encoding depends on: structure
+    names, order, datatypes, nesting and multivalued flags.
+    """
+    index = base.__pathindex__
+    description = [(name, index[name].struct.datatype
+        if index[name].is_field else None, index[name].multivalued,
+        index[name].parent) for name in index.order]
+    return hashlib.sha1(repr(description).encode('utf-8')).digest()[:8]
+
+def _varint(out, n):
+    while n > 0x7f:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+def _zigzag(n):
+    return n << 1 if n >= 0 else ((-n) << 1) - 1
+
+def _unzigzag(n):
+    return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+def _seconds(hour, minute, second):
+    if hour > 23 or minute > 59 or second > 59:
+        raise ValueError('Invalid time')
+    return hour * 3600 + minute * 60 + second
+
+def _pack_date(value):
+    match = DATE_RE.match(value)
+    if match is None:
+        return None
+    day, month, year = map(int, match.groups())
+    return datetime.date(year, month, day).toordinal()
+
+def _pack_time(value):
+    match = TIME_RE.match(value)
+    if match is None:
+        return None
+    return _seconds(*map(int, match.groups()))
+
+def _pack_datetime(value):
+    match = DATETIME_RE.match(value)
+    if match is None:
+        return None
+    day, month, year, hour, minute, second = map(int, match.groups())
+    return datetime.date(year, month, day).toordinal() * 86400 + \
+        _seconds(hour, minute, second)
+
+def _unpack_date(n):
+    date = datetime.date.fromordinal(n)
+    return '%02d/%02d/%04d' % (date.day, date.month, date.year)
+
+def _unpack_time(n):
+    return '%02d:%02d:%02d' % (n // 3600, n // 60 % 60, n % 60)
+
+def _unpack_datetime(n):
+    return '%s %s' % (_unpack_date(n // 86400), _unpack_time(n % 86400))
+
+class BinaryCodec(object):
+
+    """
+    Compact binary encoding of documents, MessagePack-like. Structure names
+    are replaced by integer ids taken from the base path index, date and
+    time fields (also when stored as strings in Lightbase format) are encoded
+    as integers and multivalued numeric fields as packed arrays. Encoded
+    data starts with a header holding the format version and the base
+    fingerprint, so data encoded for another version of the base is detected
+    (StaleEncodingError) instead of decoded wrongly.
+    """
+
+    def __init__(self, base):
+        """
+        @param base: Base object.
+        """
+        self.base = base
+
+        # @property fingerprint: See base_fingerprint().
+        self.fingerprint = base_fingerprint(base)
+
+        # @property header: Bytes at the start of encoded documents.
+        self.header = MAGIC + bytes([VERSION]) + self.fingerprint
+
+        index = base.__pathindex__
+        self._ids = {'_metadata': METADATA_ID}
+        self._names = ['_metadata']
+        self._encoders = { }
+        for name in index.order:
+            self._ids[name] = len(self._names)
+            self._names.append(name)
+            spath = index[name]
+            if spath.is_field:
+                self._encoders[name] = self._field_encoder(spath)
+            else:
+                self._encoders[name] = self._group_encoder(spath)
+        self._encoders['_metadata'] = self._write
+
+    def encode(self, document):
+        """
+        @param document: Document dictionary or base metaclass instance.
+        @return: Encoded document (bytes).
+        """
+        if not isinstance(document, dict):
+            metadata = getattr(document, '_metadata', None)
+            document = self.base.converter.document2dict(document)
+            if metadata is not None:
+                document['_metadata'] = metadata.__dict__
+        out = bytearray(self.header)
+        self._write_group(out, document)
+        return bytes(out)
+
+    def decode(self, data, as_document=False):
+        """
+        @param data: Encoded document.
+        @param as_document: Return a base metaclass instance instead of a
+        document dictionary.
+        """
+        data = memoryview(data)
+        header = self.header
+        if bytes(data[:len(MAGIC)]) != MAGIC:
+            raise exc.CodecError('Data is not a binary encoded document.')
+        if data[len(MAGIC)] != VERSION:
+            raise exc.CodecError('Unsupported binary encoding version: %s'
+                % data[len(MAGIC)])
+        if bytes(data[:len(header)]) != header:
+            raise exc.StaleEncodingError('Document was encoded for another '
+                'version of base %s.' % self.base.metadata.name)
+        try:
+            document, position = self._read(data, len(header))
+        except (IndexError, ValueError, struct.error) as e:
+            raise exc.CodecError('Invalid binary encoded document: %s' % e)
+        if position != len(data) or not isinstance(document, dict):
+            raise exc.CodecError('Invalid binary encoded document.')
+        if as_document:
+            return self.base.converter.dict2document(document)
+        return document
+
+    # Encoding
+
+    def _field_encoder(self, spath):
+        datatype = spath.datatype
+        pack, tag = {
+            standard.Date: (_pack_date, DATE_STR),
+            standard.Time: (_pack_time, TIME_STR),
+            standard.DateTime: (_pack_datetime, DATETIME_STR)
+        }.get(datatype, (None, None))
+        write = self._write
+
+        if pack is not None:
+            def write_value(out, value):
+                if type(value) is str:
+                    try:
+                        n = pack(value)
+                    except ValueError:
+                        n = None
+                    if n is not None:
+                        out.append(tag)
+                        _varint(out, n)
+                        return
+                write(out, value)
+        else:
+            write_value = write
+
+        if not spath.struct.multivalued:
+            return write_value
+
+        if datatype is standard.Integer:
+            packed_type, packed_tag = int, PACKED_INT
+        elif datatype in (standard.Decimal, standard.Money):
+            packed_type, packed_tag = float, PACKED_FLOAT
+        else:
+            packed_type = None
+
+        def write_list(out, value):
+            if type(value) is not list:
+                write(out, value)
+                return
+            if value and packed_type is not None and \
+                    all(type(element) is packed_type for element in value):
+                out.append(packed_tag)
+                _varint(out, len(value))
+                if packed_tag == PACKED_INT:
+                    for element in value:
+                        _varint(out, _zigzag(element))
+                else:
+                    out += struct.pack('<%dd' % len(value), *value)
+                return
+            out.append(LIST)
+            _varint(out, len(value))
+            for element in value:
+                write_value(out, element)
+
+        return write_list
+
+    def _group_encoder(self, spath):
+        if not spath.multivalued:
+            return self._write_group
+
+        def write_groups(out, value):
+            out.append(LIST)
+            _varint(out, len(value))
+            for element in value:
+                self._write_group(out, element)
+
+        return write_groups
+
+    def _write_group(self, out, dictobj):
+        if not isinstance(dictobj, dict):
+            raise exc.CodecError('Expected a group object, found %r'
+                % (dictobj,))
+        ids = self._ids
+        encoders = self._encoders
+        out.append(GROUP)
+        _varint(out, len(dictobj))
+        for name, value in dictobj.items():
+            try:
+                _varint(out, ids[name])
+            except KeyError:
+                raise exc.CodecError("Field %s doesn't exist on base "
+                    "definition." % name)
+            encoders[name](out, value)
+
+    def _write(self, out, value):
+        # Schema-less values
+        kind = type(value)
+        if value is None:
+            out.append(NULL)
+        elif kind is bool:
+            out.append(TRUE if value else FALSE)
+        elif kind is int:
+            out.append(INT)
+            _varint(out, _zigzag(value))
+        elif kind is float:
+            out.append(FLOAT)
+            out += struct.pack('<d', value)
+        elif kind is str:
+            data = value.encode('utf-8')
+            out.append(STR)
+            _varint(out, len(data))
+            out += data
+        elif kind in (list, tuple):
+            out.append(LIST)
+            _varint(out, len(value))
+            for element in value:
+                self._write(out, element)
+        elif kind is dict:
+            out.append(MAP)
+            _varint(out, len(value))
+            for key, element in value.items():
+                self._write(out, key)
+                self._write(out, element)
+        elif kind is bytes:
+            out.append(BYTES)
+            _varint(out, len(value))
+            out += value
+        elif kind is datetime.datetime and value.tzinfo is None:
+            out.append(DATETIME)
+            _varint(out, (value.toordinal() * 86400 + _seconds(value.hour,
+                value.minute, value.second)) * 1000000 + value.microsecond)
+        elif kind is datetime.date:
+            out.append(DATE)
+            _varint(out, value.toordinal())
+        elif kind is datetime.time and value.tzinfo is None:
+            out.append(TIME)
+            _varint(out, _seconds(value.hour, value.minute, value.second) *
+                1000000 + value.microsecond)
+        else:
+            # Subclasses, objects with _encoded() and other values go
+            # through the JSON conversion.
+            for kind in (bool, int, float, str, list, dict):
+                if isinstance(value, kind):
+                    self._write(out, kind(value))
+                    return
+            self._write(out, lbutils.encode_default(value))
+
+    # Decoding
+
+    def _read(self, data, position):
+        tag = data[position]
+        position += 1
+        if tag == NULL:
+            return None, position
+        if tag == FALSE:
+            return False, position
+        if tag == TRUE:
+            return True, position
+        if tag == FLOAT:
+            return struct.unpack_from('<d', data, position)[0], position + 8
+        if tag in (STR, BYTES):
+            size, position = _read_varint(data, position)
+            if position + size > len(data):
+                raise IndexError('Unexpected end of data')
+            value = bytes(data[position:position + size])
+            if tag == STR:
+                value = value.decode('utf-8')
+            return value, position + size
+        if tag in (LIST, MAP, GROUP, PACKED_FLOAT, PACKED_INT):
+            size, position = _read_varint(data, position)
+            if tag == PACKED_FLOAT:
+                return list(struct.unpack_from('<%dd' % size, data,
+                    position)), position + size * 8
+            if tag == PACKED_INT:
+                value = [ ]
+                for _ in range(size):
+                    n, position = _read_varint(data, position)
+                    value.append(_unzigzag(n))
+                return value, position
+            if tag == LIST:
+                value = [ ]
+                for _ in range(size):
+                    element, position = self._read(data, position)
+                    value.append(element)
+                return value, position
+            value = { }
+            names = self._names
+            for _ in range(size):
+                if tag == GROUP:
+                    key, position = _read_varint(data, position)
+                    key = names[key]
+                else:
+                    key, position = self._read(data, position)
+                value[key], position = self._read(data, position)
+            return value, position
+        n, position = _read_varint(data, position)
+        if tag == INT:
+            return _unzigzag(n), position
+        if tag == DATE_STR:
+            return _unpack_date(n), position
+        if tag == TIME_STR:
+            return _unpack_time(n), position
+        if tag == DATETIME_STR:
+            return _unpack_datetime(n), position
+        if tag == DATE:
+            return datetime.date.fromordinal(n), position
+        if tag == TIME:
+            seconds, microsecond = divmod(n, 1000000)
+            return datetime.time(seconds // 3600, seconds // 60 % 60,
+                seconds % 60, microsecond), position
+        if tag == DATETIME:
+            seconds, microsecond = divmod(n, 1000000)
+            days, seconds = divmod(seconds, 86400)
+            return datetime.datetime.combine(datetime.date.fromordinal(days),
+                datetime.time(seconds // 3600, seconds // 60 % 60,
+                seconds % 60, microsecond)), position
+        raise ValueError('Unknown tag %s' % tag)
+
+def _read_varint(data, position):
+    n = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        n |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return n, position
+        shift += 7
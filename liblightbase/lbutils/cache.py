@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import threading
+from collections import OrderedDict
+
+class LRUCache(object):
+
+    """
+    Bounded, thread-safe mapping that discards the least recently used entry
+    when full. Hits, misses and evictions are counted.
+    """
+
+    def __init__(self, maxsize=128):
+
+        # @property maxsize: Maximum number of entries.
+        self.maxsize = maxsize
+
+        # @property hits, misses, evictions: Cache statistics.
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        @param key: Cache key.
+        @param default: Value returned on cache miss.
+        """
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        @param key: Cache key.
+        @param value: Value to cache.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        """
+        @param key: Cache key.
+        @param default: Value returned if key is not cached.
+        """
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
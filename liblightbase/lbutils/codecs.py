@@ -1,6 +1,19 @@
+import os
+import re
 import json
+import math
 import datetime
 
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+try:
+    import ujson as _ujson
+except ImportError:
+    _ujson = None
+
 JSON_TYPES = (
     dict,        # object
     list,        # array
@@ -10,72 +23,191 @@ JSON_TYPES = (
     type(None)   # null
 )
 
-# ********************************** 
+# **********************************
 # * Document default encode/decode *
-# ********************************** 
+# **********************************
+
+def encode_default(obj):
+    """Convert ``obj`` to something JSON encoder can handle."""
+
+    if isinstance(obj, datetime.datetime):
+        obj = obj.strftime('%d/%m/%Y %H:%M:%S')
+
+    elif isinstance(obj, datetime.time):
+        obj = obj.strftime('%H:%M:%S')
+
+    elif isinstance(obj, datetime.date):
+        obj = obj.strftime('%d/%m/%Y')
+
+    else:
+        # method to generate JSON
+        obj = obj._encoded()
+
+    return obj
 
 class DocumentJSONEncoder(json.JSONEncoder):
 
     def default(self, obj):
         """Convert ``obj`` to something JSON encoder can handle."""
+        return encode_default(obj)
+
+# ****************
+# * JSON backend *
+# ****************
 
-        if isinstance(obj, datetime.datetime):
-            obj = obj.strftime('%d/%m/%Y %H:%M:%S')
+# @property JSON_BACKENDS: JSON libraries supported, fastest first. The
+# standard library json module is always available.
+JSON_BACKENDS = ('orjson', 'ujson', 'json')
 
-        elif isinstance(obj, datetime.time):
-            obj = obj.strftime('%H:%M:%S')
+_BACKEND_MODULES = {
+    'orjson': _orjson,
+    'ujson': _ujson,
+    'json': json
+}
 
-        elif isinstance(obj, datetime.date):
-            obj = obj.strftime('%d/%m/%Y')
+if _orjson is not None:
+    _ORJSON_OPTIONS = _orjson.OPT_PASSTHROUGH_DATETIME |\
+        _orjson.OPT_PASSTHROUGH_DATACLASS |\
+        _orjson.OPT_NON_STR_KEYS
 
-        else:
-            # method to generate JSON
-            obj = obj._encoded()
+# Decoder used when no custom decoding arguments are given.
+_DECODER = json.JSONDecoder()
 
-        return obj
+# orjson decodes integers wider than 64 bits as floats. They have at least 19
+# digits, so JSON without such digit runs is safe to decode with it.
+_LONG_NUMBER = re.compile(r'\d{19}')
+_LONG_NUMBER_BYTES = re.compile(br'\d{19}')
+
+def set_json_backend(name):
+    """ @param name: One of JSON_BACKENDS.
+
+        This method sets the JSON library used by object2json and json2object.
+        The LIBLIGHTBASE_JSON_BACKEND environment variable may be used to set
+        it too. By default the fastest library installed is used.
+    """
+    global _backend
+    if name not in JSON_BACKENDS:
+        raise ValueError('JSON backend must be one of %s. Instead it is %s' %
+            (JSON_BACKENDS, name))
+    if _BACKEND_MODULES[name] is None:
+        raise ImportError('JSON backend %s is not installed.' % name)
+    _backend = name
+
+def get_json_backend():
+    """ Return the name of the JSON library in use.
+    """
+    return _backend
+
+_backend = 'json'
+if os.environ.get('LIBLIGHTBASE_JSON_BACKEND'):
+    set_json_backend(os.environ['LIBLIGHTBASE_JSON_BACKEND'])
+else:
+    for _name in JSON_BACKENDS:
+        if _BACKEND_MODULES[_name] is not None:
+            _backend = _name
+            break
 
 # ************************
 # * Generic JSON encoder *
 # ************************
 
-def object2json(value, ensure_ascii=False, **kwargs):
+def _has_nonfinite(value):
+    # True if value contains NaN or Infinity floats. Objects encoded by
+    # encode_default() are not inspected.
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_nonfinite(element) for element in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_nonfinite(element) for element in value)
+    return False
+
+def object2json(value, ensure_ascii=False, as_bytes=False, **kwargs):
     """ @param value: Python object  to convert into JSON
-        @param ensure_ascii: The output is guaranteed to have all incoming 
-        non-ASCII characters escaped. Defaults to False 
-        @param kwargs: key word arguments that will be used with Python's JSON 
+        @param ensure_ascii: The output is guaranteed to have all incoming
+        non-ASCII characters escaped. Defaults to False
+        @param as_bytes: Return UTF-8 encoded bytes instead of string. Fast
+        backends produce bytes natively, so no extra encoding is needed.
+        @param kwargs: key word arguments that will be used with Python's JSON
         standard library
 
         This method receives a Python object JSON oject and tries to convert it
-        to JSON oject. 
+        to JSON oject. The fast JSON backend (see set_json_backend) is used
+        unless @ensure_ascii or @kwargs are given, in which case Python's JSON
+        standard library is used. Fast backends produce compact JSON.
     """
-    return json.dumps(value,
+    if not ensure_ascii and not kwargs:
+        if _backend == 'orjson':
+            try:
+                result = _orjson.dumps(value, default=encode_default,
+                    option=_ORJSON_OPTIONS)
+            except TypeError:
+                # Let the standard library handle (or report) values orjson
+                # can't serialize, like integers bigger than 64 bits.
+                pass
+            else:
+                # orjson writes NaN and Infinity as null, unlike the standard
+                # library. Only values producing null may have them.
+                if b'null' not in result or not _has_nonfinite(value):
+                    return result if as_bytes else result.decode('utf-8')
+        elif _backend == 'ujson':
+            try:
+                result = _ujson.dumps(value, ensure_ascii=False,
+                    escape_forward_slashes=False, default=encode_default)
+            except (TypeError, OverflowError):
+                pass
+            else:
+                return result.encode('utf-8') if as_bytes else result
+
+    result = json.dumps(value,
                      ensure_ascii=ensure_ascii,
                      cls=DocumentJSONEncoder,
                      **kwargs)
+    return result.encode('utf-8') if as_bytes else result
 
-# ************************ 
-# * Generic JSON decoder * 
-# ************************ 
+# ************************
+# * Generic JSON decoder *
+# ************************
+
+def _has_long_number(value):
+    if isinstance(value, bytes):
+        return _LONG_NUMBER_BYTES.search(value) is not None
+    return _LONG_NUMBER.search(value) is not None
 
 def json2object(value, **kwargs):
     """ @param value: JSON to convert into Python object
-        @param kwargs: key word arguments that will be used with Python's JSON 
+        @param kwargs: key word arguments that will be used with Python's JSON
         standard library
 
-        This method receives a JSON oject and tries to convert it to Python 
+        This method receives a JSON oject and tries to convert it to Python
         object.
     """
     if isinstance(value, JSON_TYPES):
         # No need to parse, if it's already a JSON type
         return value
     else:
+        if not kwargs and _backend != 'json' and not (_backend == 'orjson'
+                and _has_long_number(value)):
+            try:
+                return _BACKEND_MODULES[_backend].loads(value)
+            except ValueError:
+                # Fall back to the standard library, which is more tolerant
+                # (e.g. trailing data, NaN values)
+                pass
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
         # We do have a JSON that must have to transform it on a Python object
         try:
             # Loads JSON and return object
             # raw_decode method is used because of compatibility problems.
-            return json.JSONDecoder(**kwargs).raw_decode(value)[0]
+            if kwargs:
+                return json.JSONDecoder(**kwargs).raw_decode(value)[0]
+            return _DECODER.raw_decode(value)[0]
 
         except Exception as e:
             # JSON loading was not possible
+            if hasattr(e, 'doc') and hasattr(e, 'pos'):
+                # JSONDecodeError requires the document and position
+                raise e.__class__('Could not parse JSON data: %s' % e.msg,
+                    e.doc, e.pos)
             raise e.__class__('Could not parse JSON data: %s' % e)
-
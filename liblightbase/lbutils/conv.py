@@ -6,7 +6,7 @@ from liblightbase.lbbase.lbstruct.field import Field
 from liblightbase.lbbase.lbstruct.group import Group
 from liblightbase.lbbase.lbstruct.group import GroupMetadata
 from liblightbase import pytypes
-from liblightbase.lbdoc.metadata import DocumentMetadata
+from liblightbase.lbutils.inference import SchemaInferrer
 
 
 def json2base(jsonobj):
@@ -31,6 +31,9 @@ def json2document(base, jsonobj):
     @param base: liblightbae.lbbase.Base object
     @param jsonobj: JSON string.
     """
+    if isinstance(jsonobj, (str, bytes)):
+        # Build document objects straight from JSON text
+        return base.converter.json2document(jsonobj)
     return dict2document(base=base, dictobj=lbutils.json2object(jsonobj))
 
 
@@ -87,11 +90,10 @@ def dict2document(base, dictobj, metaclass=None):
     @param dictobj: dictionary object.
     @param metaclass: GroupMetaClass in question.
     """
-    kwargs = {}
     if metaclass is None:
-        metaclass = base.metaclass()
-        if dictobj.get('_metadata'):
-            kwargs['_metadata'] = DocumentMetadata(**dictobj.pop('_metadata'))
+        # Whole documents use the converter compiled for the base
+        return base.converter.dict2document(dictobj)
+    kwargs = {}
     for member in dictobj:
         struct = base.get_struct(member)
         if struct.is_field:
@@ -121,11 +123,11 @@ def document2dict(base, document, struct=None):
     @param document: BaseMetaClass object
     @param struct: Field or Group object 
     """
-    dictobj = { }
     if not struct:
-        snames = base.content.__snames__
-    else:
-        snames = struct.content.__snames__
+        # Whole documents use the converter compiled for the base
+        return base.converter.document2dict(document)
+    dictobj = { }
+    snames = struct.content.__snames__
     for sname in snames:
         try:
             value = getattr(document, sname)
@@ -170,6 +172,21 @@ def pyobject2base(obj):
         content=content)
 
 
+def dataset2base(name, samples, workers=None, batch_size=1000,
+        processes=True):
+    """
+    Infer base from a sample of python objects or dictionaries
+    @param name: Base name
+    @param samples: Iterable of objects or dictionaries, read lazily
+    @param workers: Number of parallel workers, see SchemaInferrer.infer
+    @param batch_size: Samples sent to a worker at a time
+    @param processes: Use processes (default) or threads as workers
+    @return: LBBase instance
+    """
+    return SchemaInferrer().infer(samples, workers, batch_size,
+        processes).base(name)
+
+
 def attribute2lbfield(attr_name, attr_type, attr_value):
     """
     Convert object attributes to LB Field
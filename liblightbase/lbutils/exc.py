@@ -1,2 +1,11 @@
 class ValidationError(Exception):
     pass
+
+class MigrationError(Exception):
+    pass
+
+class CodecError(Exception):
+    pass
+
+class StaleEncodingError(CodecError):
+    pass
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+import decimal
+import datetime
+from liblightbase import pytypes
+from liblightbase.lbbase.struct import Base
+from liblightbase.lbbase.metadata import BaseMetadata
+from liblightbase.lbbase.content import Content
+from liblightbase.lbbase.lbstruct.field import Field
+from liblightbase.lbbase.lbstruct.group import Group
+from liblightbase.lbbase.lbstruct.group import GroupMetadata
+from liblightbase.lbutils.parallel import chunks
+from liblightbase.lbutils.parallel import make_pool
+from liblightbase.lbutils.parallel import bounded_imap
+
+# @property DATATYPES: Datatype inferred from each python type. Other types
+# are looked up with pytypes.pytype2lbtype, defaulting to Text.
+DATATYPES = {
+    str: 'Text',
+    bool: 'Boolean',
+    int: 'Integer',
+    float: 'Decimal',
+    decimal.Decimal: 'Decimal',
+    datetime.datetime: 'DateTime',
+    datetime.date: 'Date',
+    datetime.time: 'Time',
+}
+
+# @property WIDENING: Datatype used when values of a structure have
+# different, but compatible, datatypes.
+WIDENING = (
+    ({'Integer', 'Decimal'}, 'Decimal'),
+    ({'Date', 'DateTime'}, 'DateTime'),
+)
+
+class SchemaNode(object):
+
+    """
+    Observed shape of one structure: the datatypes of its values, its
+    children (if values were dictionaries or objects) and whether values
+    were lists. Nodes from different samples are combined with merge().
+    """
+
+    __slots__ = ['datatypes', 'children', 'multivalued', 'nested']
+
+    def __init__(self):
+        # @property datatypes: Datatypes of scalar values.
+        self.datatypes = set()
+
+        # @property children: {name: SchemaNode} if dictionaries or objects
+        # were found, else None.
+        self.children = None
+
+        # @property multivalued: True if lists were found.
+        self.multivalued = False
+
+        # @property nested: True if lists of lists were found.
+        self.nested = False
+
+    def observe(self, value, element=False):
+        """
+        @param value: Python value found for this structure.
+        @param element: True if value is a list element.
+        """
+        if value is None:
+            return
+        kind = type(value)
+        if kind in DATATYPES:
+            self.datatypes.add(DATATYPES[kind])
+        elif isinstance(value, (list, tuple)):
+            if element:
+                self.nested = True
+            else:
+                self.multivalued = True
+                for item in value:
+                    self.observe(item, True)
+        elif isinstance(value, dict):
+            self.observe_members(value.items())
+        elif hasattr(value, '__dict__'):
+            self.observe_members(vars(value).items())
+        else:
+            self.datatypes.add(pytypes.pytype2lbtype(kind) or 'Text')
+
+    def observe_members(self, members):
+        if self.children is None:
+            self.children = { }
+        children = self.children
+        for name, value in members:
+            try:
+                child = children[name]
+            except KeyError:
+                child = children[name] = SchemaNode()
+            child.observe(value)
+
+    def merge(self, other):
+        """
+        @param other: SchemaNode to combine into this one.
+        """
+        self.datatypes |= other.datatypes
+        self.multivalued |= other.multivalued
+        self.nested |= other.nested
+        if other.children is not None:
+            if self.children is None:
+                self.children = { }
+            for name, child in other.children.items():
+                if name in self.children:
+                    self.children[name].merge(child)
+                else:
+                    self.children[name] = child
+        return self
+
+    @property
+    def datatype(self):
+        """ @property datatype: Field datatype for the observed values.
+        """
+        if self.nested or (self.children is not None and self.datatypes):
+            # Mixed shapes can only be kept as JSON
+            return 'Json'
+        if not self.datatypes:
+            return 'Text'
+        if len(self.datatypes) == 1:
+            return next(iter(self.datatypes))
+        for datatypes, datatype in WIDENING:
+            if self.datatypes <= datatypes:
+                return datatype
+        return 'Text'
+
+    @property
+    def is_group(self):
+        return self.children is not None and self.datatype != 'Json'
+
+class SchemaInferrer(object):
+
+    """
+    Infers a base from a sample of objects or dictionaries. Values found for
+    each structure on all samples are merged: numeric types are widened,
+    incompatible types become Text, lists make structures multivalued (lists
+    of dictionaries make multivalued groups) and mixed shapes become Json
+    fields. Samples are read lazily and may be spread over a process pool.
+    """
+
+    def __init__(self):
+        # @property root: SchemaNode of the samples themselves.
+        self.root = SchemaNode()
+
+        # @property count: Number of samples observed.
+        self.count = 0
+
+    def update(self, samples):
+        """
+        @param samples: Iterable of objects or dictionaries.
+        """
+        for sample in samples:
+            self.root.observe(sample)
+            self.count += 1
+        return self
+
+    def merge(self, other):
+        """
+        @param other: SchemaInferrer to combine into this one.
+        """
+        self.root.merge(other.root)
+        self.count += other.count
+        return self
+
+    def infer(self, samples, workers=None, batch_size=1000, processes=True):
+        """
+        @param samples: Iterable of objects or dictionaries. It's consumed
+        lazily.
+        @param workers: Number of parallel workers. Runs on the current
+        process if None or 1.
+        @param batch_size: Samples sent to a worker at a time.
+        @param processes: Use processes (default) or threads as workers.
+        Samples must be picklable when using processes.
+        """
+        if not workers or workers < 2:
+            return self.update(samples)
+        pool = make_pool(workers, processes)
+        try:
+            for inferrer in bounded_imap(pool, _infer_batch,
+                    chunks(samples, batch_size), workers * 2):
+                self.merge(inferrer)
+        finally:
+            pool.terminate()
+            pool.join()
+        return self
+
+    def base(self, name, description=None):
+        """
+        @param name: Base name.
+        @param description: Base description. Defaults to name.
+        @return: Base object.
+        """
+        if not self.root.children:
+            raise ValueError('No structures found on samples.')
+        content = self._content(self.root, set())
+        return Base(metadata=BaseMetadata(name=name,
+            description=description or name), content=content)
+
+    def _content(self, node, names):
+        content = Content()
+        for name, child in node.children.items():
+            if name.lower() in names:
+                raise ValueError('Structure name %s found more than once on '
+                    'samples. Structure names must be unique on a base.'
+                    % name)
+            names.add(name.lower())
+            if child.is_group:
+                content.append(Group(
+                    metadata=GroupMetadata(
+                        name=name,
+                        alias=name,
+                        description=name,
+                        multivalued=child.multivalued),
+                    content=self._content(child, names)))
+            else:
+                content.append(Field(
+                    name=name,
+                    alias=name,
+                    description=name,
+                    datatype=child.datatype,
+                    indices=['Textual'],
+                    multivalued=child.multivalued,
+                    required=False))
+        return content
+
+def _infer_batch(batch):
+    return SchemaInferrer().update(batch)
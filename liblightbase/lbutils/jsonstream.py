@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+import re
+import json
+import codecs
+
+# @property WHITESPACE: JSON insignificant whitespace.
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# Characters that may follow the end of an incomplete number.
+NUMBER_TAIL = re.compile(r'[0-9.eE+-]*')
+
+class JSONObjectStream(object):
+
+    """
+    Incremental decoder for a JSON object read in chunks (e.g. a HTTP
+    response body). Elements of one array member are yielded one at a time,
+    as soon as they are read, so neither the whole text nor the whole array
+    are held in memory. All other members are decoded and stored on
+    ``members`` when they are reached. The stream can be iterated once.
+    """
+
+    def __init__(self, chunks, array_key):
+        """
+        @param chunks: Iterable of str or bytes (UTF-8) chunks.
+        @param array_key: Name of the member whose elements are yielded.
+        """
+        self.chunks = iter(chunks)
+        self.array_key = array_key
+
+        # @property members: Other members of the object read so far.
+        self.members = { }
+
+        # @property count: Number of array elements yielded so far.
+        self.count = 0
+
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+        self._unicode = codecs.getincrementaldecoder('utf-8')()
+
+    def _read(self, size=0):
+        # Append chunks to the buffer, dropping consumed text, until at least
+        # size characters are buffered (one chunk at least). Returns False if
+        # there are no more chunks.
+        pieces = [self._buffer[self._pos:]]
+        length = len(pieces[0])
+        while not self._eof:
+            try:
+                chunk = next(self.chunks)
+            except StopIteration:
+                self._eof = True
+                chunk = self._unicode.decode(b'', True)
+            if isinstance(chunk, bytes):
+                chunk = self._unicode.decode(chunk)
+            pieces.append(chunk)
+            length += len(chunk)
+            if length >= size:
+                break
+        if len(pieces) == 1:
+            return False
+        self._buffer = ''.join(pieces)
+        self._pos = 0
+        return True
+
+    def _skip(self):
+        # Skip whitespace, returning next char or '' at the end of data.
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read():
+                return ''
+
+    def _expect(self, chars):
+        char = self._skip()
+        if not char:
+            raise ValueError('Could not parse JSON data: unexpected end of'
+                ' data, expecting one of %s' % list(chars))
+        if char not in chars:
+            raise ValueError('Could not parse JSON data: expecting one of %s,'
+                ' found %s' % (list(chars), char))
+        self._pos += 1
+        return char
+
+    def _value(self):
+        self._skip()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except ValueError as e:
+                # Value is incomplete (or invalid). Buffered text is doubled
+                # before trying again, so big values are parsed a few times
+                # only.
+                if self._read(2 * (len(self._buffer) - self._pos)):
+                    continue
+                raise ValueError('Could not parse JSON data: %s' % e)
+            if isinstance(value, (int, float)) and \
+                    NUMBER_TAIL.match(self._buffer, end).end() == \
+                    len(self._buffer) and self._read():
+                # Numbers may continue on the next chunk
+                continue
+            self._pos = end
+            return value
+
+    def _array(self):
+        self._expect('[')
+        if self._skip() == ']':
+            self._pos += 1
+            return
+        while True:
+            value = self._value()
+            self.count += 1
+            yield value
+            if self._expect(',]') == ']':
+                return
+
+    def __iter__(self):
+        self._expect('{')
+        if self._skip() == '}':
+            self._pos += 1
+            return
+        while True:
+            self._skip()
+            key = self._value()
+            if not isinstance(key, str):
+                raise ValueError('Could not parse JSON data: invalid key %s'
+                    % key)
+            self._expect(':')
+            if key == self.array_key and self._skip() == '[':
+                for value in self._array():
+                    yield value
+            else:
+                self.members[key] = self._value()
+            if self._expect(',}') == '}':
+                return
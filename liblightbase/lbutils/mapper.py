@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+import typing
+import datetime
+from liblightbase.lbtypes import standard
+
+try:
+    import dataclasses
+except ImportError:
+    dataclasses = None
+
+# @property DATE_FORMATS: Lightbase string format and python type of date and
+# time datatypes.
+DATE_FORMATS = {
+    standard.Date: ('%d/%m/%Y', datetime.date),
+    standard.Time: ('%H:%M:%S', datetime.time),
+    standard.DateTime: ('%d/%m/%Y %H:%M:%S', datetime.datetime),
+}
+
+def is_dataclass(cls):
+    return dataclasses is not None and isinstance(cls, type) and \
+        dataclasses.is_dataclass(cls)
+
+class ObjectMapper(object):
+
+    """
+    Converts instances of a python class to and from documents of a base,
+    with the base modeled the way pyobject2base does: attributes holding
+    objects or dictionaries are groups, lists of them are multivalued groups
+    and other lists are multivalued fields. Converters are compiled once from
+    the base structure, so attribute names are known beforehand and objects
+    are never inspected. Date, Time and DateTime fields are converted between
+    python date/time objects and Lightbase strings.
+    """
+
+    def __init__(self, cls, base, classes=None, parse_dates=True):
+        """
+        @param cls: Class mapped to documents. Plain classes are built
+        without calling __init__; dataclasses are built calling it, so
+        defaults apply to missing structures.
+        @param base: Base object.
+        @param classes: Dictionary in the format {group name: class} with the
+        classes of nested objects. For dataclasses they are taken from type
+        hints (X or List[X]) when missing. Groups without class are mapped
+        to dictionaries.
+        @param parse_dates: Convert date and time fields back to python
+        objects.
+        """
+        self.cls = cls
+        self.base = base
+        self.classes = dict(classes or { })
+        self.parse_dates = parse_dates
+        self._todict = self._compile_todict(base.content)
+        self._fromdict = self._compile_fromdict(base.content, cls)
+
+    def to_dict(self, obj):
+        """
+        @param obj: Instance of mapped class (or dictionary).
+        @return: Document dictionary.
+        """
+        return self._todict(obj)
+
+    def from_dict(self, dictobj):
+        """
+        @param dictobj: Document dictionary.
+        @return: Instance of mapped class.
+        """
+        return self._fromdict(dictobj)
+
+    def to_document(self, obj):
+        """
+        @param obj: Instance of mapped class.
+        @return: Base metaclass instance.
+        """
+        return self.base.converter.dict2document(self._todict(obj))
+
+    def from_document(self, document):
+        """
+        @param document: Base metaclass instance.
+        @return: Instance of mapped class.
+        """
+        return self._fromdict(self.base.converter.document2dict(document))
+
+    def to_documents(self, objects):
+        """
+        @param objects: Iterable of instances of mapped class.
+        @return: Generator of base metaclass instances.
+        """
+        todict = self._todict
+        dict2document = self.base.converter.dict2document
+        return (dict2document(todict(obj)) for obj in objects)
+
+    def from_documents(self, documents):
+        """
+        @param documents: Iterable of base metaclass instances.
+        @return: Generator of instances of mapped class.
+        """
+        fromdict = self._fromdict
+        document2dict = self.base.converter.document2dict
+        return (fromdict(document2dict(document)) for document in documents)
+
+    def _compile_todict(self, content):
+        members = [ ]
+        for struct in content:
+            if struct.is_field:
+                sname = struct.name
+                convert = self._format_date(struct)
+                if convert is not None and struct.multivalued:
+                    convert = _multivalued(convert)
+            else:
+                sname = struct.metadata.name
+                convert = self._compile_todict(struct.content)
+                if struct.metadata.multivalued:
+                    convert = _multivalued(convert)
+            members.append((sname, convert))
+
+        def todict(obj):
+            dictobj = { }
+            is_dict = isinstance(obj, dict)
+            for sname, convert in members:
+                if is_dict:
+                    value = obj.get(sname)
+                else:
+                    value = getattr(obj, sname, None)
+                if value is None:
+                    continue
+                dictobj[sname] = value if convert is None else convert(value)
+            return dictobj
+
+        return todict
+
+    def _compile_fromdict(self, content, cls):
+        hints = self._hints(cls)
+        members = [ ]
+        for struct in content:
+            if struct.is_field:
+                sname = struct.name
+                convert = self._parse_date(struct) if self.parse_dates \
+                    else None
+                if convert is not None and struct.multivalued:
+                    convert = _multivalued(convert)
+            else:
+                sname = struct.metadata.name
+                convert = self._compile_fromdict(struct.content,
+                    self.classes.get(sname, hints.get(sname)))
+                if struct.metadata.multivalued:
+                    convert = _multivalued(convert)
+            members.append((sname, convert))
+
+        if cls is None:
+            def build(kwargs):
+                return kwargs
+        elif is_dataclass(cls):
+            def build(kwargs):
+                return cls(**kwargs)
+        else:
+            snames = [sname for sname, convert in members]
+            def build(kwargs):
+                obj = cls.__new__(cls)
+                for sname in snames:
+                    setattr(obj, sname, kwargs.get(sname))
+                return obj
+
+        def fromdict(dictobj):
+            kwargs = { }
+            for sname, convert in members:
+                value = dictobj.get(sname)
+                if value is None:
+                    continue
+                kwargs[sname] = value if convert is None else convert(value)
+            return build(kwargs)
+
+        return fromdict
+
+    def _hints(self, cls):
+        # Classes of nested objects, from dataclass type hints
+        if not is_dataclass(cls):
+            return { }
+        try:
+            hints = typing.get_type_hints(cls)
+        except Exception:
+            return { }
+        classes = { }
+        for name, hint in hints.items():
+            if getattr(hint, '__origin__', None) in (list, typing.List):
+                hint = (getattr(hint, '__args__', None) or (None,))[0]
+            if isinstance(hint, type) and hint.__module__ != 'builtins':
+                classes[name] = hint
+        return classes
+
+    def _format_date(self, field):
+        format, pytype = DATE_FORMATS.get(field._datatype.__schema__,
+            (None, None))
+        if format is None:
+            return None
+
+        def format_date(value):
+            if isinstance(value, (datetime.date, datetime.time)):
+                return value.strftime(format)
+            return value
+
+        return format_date
+
+    def _parse_date(self, field):
+        format, pytype = DATE_FORMATS.get(field._datatype.__schema__,
+            (None, None))
+        if format is None:
+            return None
+
+        def parse_date(value):
+            if not isinstance(value, str) or not value:
+                return value
+            value = datetime.datetime.strptime(value, format)
+            if pytype is datetime.date:
+                return value.date()
+            if pytype is datetime.time:
+                return value.time()
+            return value
+
+        return parse_date
+
+def _multivalued(convert):
+    def multivalued(value):
+        return [convert(element) for element in value]
+    return multivalued
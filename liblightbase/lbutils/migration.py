@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+import copy
+import time
+from liblightbase.lbutils.exc import MigrationError
+from liblightbase.lbutils.const import PYSTR
+from liblightbase.lbutils.conv import json2base
+from liblightbase.lbutils.conv import dict2document
+from liblightbase.lbutils.conv import document2dict
+from liblightbase.lbutils.parallel import chunks
+from liblightbase.lbutils.parallel import make_pool
+from liblightbase.lbutils.parallel import bounded_imap
+
+class MigrationReport(object):
+
+    """
+    Keeps track of a migration run: how many documents were read, migrated
+    and failed, and how fast.
+    """
+
+    def __init__(self):
+
+        # @property total: Number of documents read.
+        self.total = 0
+
+        # @property migrated: Number of documents successfully migrated.
+        self.migrated = 0
+
+        # @property failures: List of tuples in the format (position, id_doc,
+        # error message) for each document that could not be migrated.
+        self.failures = [ ]
+
+        # @property started: Run start time (seconds since epoch).
+        self.started = time.time()
+
+        # @property elapsed: Seconds elapsed until the last processed batch.
+        self.elapsed = 0.0
+
+    @property
+    def failed(self):
+        """ @property failed: Number of documents that failed.
+        """
+        return len(self.failures)
+
+    @property
+    def throughput(self):
+        """ @property throughput: Documents per second.
+        """
+        if not self.elapsed:
+            return 0.0
+        return self.total / self.elapsed
+
+    def __repr__(self):
+        return '<MigrationReport total=%d migrated=%d failed=%d %.1f docs/s>'\
+            % (self.total, self.migrated, self.failed, self.throughput)
+
+
+class Migration(object):
+
+    """
+    Document migration between two versions of a base. The per-document
+    transform is compiled once from both base definitions: structures are
+    matched by name (or by @renames), removed structures are dropped,
+    multivalued changes wrap or unwrap values and datatype changes are cast.
+    """
+
+    def __init__(self, old_base, new_base, renames=None, defaults=None):
+        """
+        @param old_base: Base object documents currently conform to.
+        @param new_base: Base object documents must be migrated to.
+        @param renames: Dictionary in the format {old name: new name}.
+        @param defaults: Dictionary in the format {new name: value}, used to
+        fill structures absent on the old document (e.g. new required fields).
+        """
+        self.old_base = old_base
+        self.new_base = new_base
+        self.renames = renames or { }
+        self.defaults = defaults or { }
+
+        self._check_moves()
+
+        # @property transform: Compiled transform function. Receives a
+        # document dictionary (without _metadata) and returns a new one.
+        self.transform = self._compile_level(None, None)
+
+    def _old_name(self, new_name):
+        for old_name, _new_name in self.renames.items():
+            if _new_name == new_name:
+                return old_name
+        if new_name in self.renames:
+            # The name was renamed away: it is a brand new structure
+            return None
+        return new_name
+
+    def _check_moves(self):
+        old_index = self.old_base.__pathindex__
+        for new in self.new_base.__pathindex__.values():
+            old = old_index.get(self._old_name(new.name))
+            if old is None:
+                continue
+            old_parent = None
+            if new.parent is not None:
+                old_parent = self._old_name(new.parent)
+            if old.parent != old_parent:
+                raise MigrationError('Structure %s moved from %s to %s. '
+                    'Moving structures between groups is not supported.' %
+                    (new.name, old.parent, new.parent))
+
+    def _compile_level(self, new_parent, old_parent):
+        old_index = self.old_base.__pathindex__
+        steps = [ ]
+        defaults = [ ]
+        for new in self.new_base.__pathindex__.children(new_parent):
+            if new.name in self.defaults:
+                defaults.append((new.name, self.defaults[new.name]))
+            old = old_index.get(self._old_name(new.name))
+            if old is None:
+                continue
+            if old.is_field != new.is_field:
+                raise MigrationError('Structure %s changed from field to group'
+                    ' (or vice versa).' % new.name)
+            if new.is_field:
+                fn = self._compile_field(old, new)
+            else:
+                fn = self._compile_group(old, new)
+            steps.append((old.name, new.name, fn))
+
+        def transform(dictobj):
+            newobj = { }
+            for old_name, new_name, fn in steps:
+                if old_name in dictobj:
+                    value = dictobj[old_name]
+                    newobj[new_name] = value if fn is None else fn(value)
+            for new_name, value in defaults:
+                if newobj.get(new_name) is None:
+                    if isinstance(value, (dict, list)):
+                        # Don't share containers among documents
+                        value = copy.deepcopy(value)
+                    newobj[new_name] = value
+            return newobj
+
+        return transform
+
+    def _compile_field(self, old, new):
+        cast = None
+        if old.datatype is not new.datatype:
+            cast = self._compile_cast(new.datatype)
+        return self._compile_multivalued(old, new, cast)
+
+    def _compile_group(self, old, new):
+        transform = self._compile_level(new.name, old.name)
+        return self._compile_multivalued(old, new, transform)
+
+    def _compile_cast(self, datatype):
+        pytype = datatype.__pytype__
+        cast_str = datatype.cast_str
+
+        def cast(value):
+            if value is None or isinstance(value, pytype):
+                return value
+            if not isinstance(value, PYSTR):
+                value = str(value)
+            return cast_str(value)
+
+        return cast
+
+    def _compile_multivalued(self, old, new, fn):
+        if old.multivalued == new.multivalued:
+            if fn is None or not new.multivalued:
+                return fn
+            return lambda value: value if value is None else \
+                [fn(element) for element in value]
+
+        elif new.multivalued:
+            def wrap(value):
+                if value is None:
+                    return [ ]
+                return [value if fn is None else fn(value)]
+            return wrap
+
+        else:
+            name = new.name
+            def unwrap(value):
+                if not value:
+                    return None
+                if len(value) > 1:
+                    raise MigrationError('Structure %s has %d values but is '
+                        'not multivalued anymore.' % (name, len(value)))
+                return value[0] if fn is None else fn(value[0])
+            return unwrap
+
+    def migrate(self, document):
+        """
+        @param document: Document dictionary or BaseMetaClass object
+        conforming to the old base.
+        @return: New document dictionary conforming to the new base. Document
+        metadata is kept as is.
+        """
+        if not isinstance(document, dict):
+            _metadata = getattr(document, '_metadata', None)
+            document = document2dict(self.old_base, document)
+            if _metadata is not None:
+                document['_metadata'] = _metadata.__dict__
+        newdoc = self.transform(document)
+        if '_metadata' in document:
+            newdoc['_metadata'] = document['_metadata']
+        return newdoc
+
+    def _migrate_batch(self, batch, validate=False):
+        results = [ ]
+        for position, document in batch:
+            try:
+                newdoc = self.migrate(document)
+                if validate:
+                    dictobj = dict(newdoc)
+                    dictobj.pop('_metadata', None)
+                    dict2document(self.new_base, dictobj)
+            except Exception as e:
+                _metadata = document.get('_metadata') \
+                    if isinstance(document, dict) else None
+                id_doc = _metadata.get('id_doc') if _metadata else None
+                results.append((position, False, (id_doc, '%s: %s' % (
+                    e.__class__.__name__, e))))
+            else:
+                results.append((position, True, newdoc))
+        return results
+
+    def run(self, documents, workers=None, batch_size=500, processes=True,
+            validate=False):
+        """
+        @param documents: Iterable of document dictionaries. It is consumed
+        lazily.
+        @param workers: Number of parallel workers. Runs on the current
+        process if None or 1.
+        @param batch_size: Documents sent to a worker at a time.
+        @param processes: Use processes (default) or threads as workers.
+        @param validate: Validate each migrated document against the new base.
+        @return: Generator of migrated document dictionaries, in input order.
+        Failed documents are not yielded; they are collected on
+        self.report.failures instead.
+
+        The number of batches in flight is bounded to twice the number of
+        workers, so memory usage doesn't grow with the input size.
+        """
+        self.report = MigrationReport()
+        return self._run(documents, workers, batch_size, processes, validate)
+
+    def _run(self, documents, workers, batch_size, processes, validate):
+        report = self.report
+        batches = chunks(enumerate(documents), batch_size)
+        pool = None
+        if workers and workers > 1:
+            if processes:
+                pool = make_pool(workers, True, _init_worker,
+                    (self.old_base.json, self.new_base.json, self.renames,
+                    self.defaults, validate))
+                func = _migrate_batch
+            else:
+                pool = make_pool(workers, False)
+                func = lambda batch: self._migrate_batch(batch, validate)
+            results = bounded_imap(pool, func, batches, workers * 2)
+        else:
+            results = (self._migrate_batch(batch, validate)
+                for batch in batches)
+        try:
+            for batch in results:
+                for position, ok, payload in batch:
+                    report.total += 1
+                    if ok:
+                        report.migrated += 1
+                        yield payload
+                    else:
+                        report.failures.append((position,) + payload)
+                report.elapsed = time.time() - report.started
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+# Migration object owned by each worker process.
+_worker_migration = None
+_worker_validate = False
+
+def _init_worker(old_json, new_json, renames, defaults, validate):
+    global _worker_migration, _worker_validate
+    _worker_migration = Migration(json2base(old_json), json2base(new_json),
+        renames, defaults)
+    _worker_validate = validate
+
+def _migrate_batch(batch):
+    return _worker_migration._migrate_batch(batch, _worker_validate)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import collections
+import itertools
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
+def chunks(iterable, size):
+    """
+    @param iterable: Any iterable.
+    @param size: Maximum chunk size.
+
+    This method consumes @iterable lazily, yielding lists of at most @size
+    elements.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def make_pool(workers, processes=True, initializer=None, initargs=()):
+    """
+    @param workers: Number of workers.
+    @param processes: Use a process pool if True, a thread pool otherwise.
+    @param initializer: Callable run once by each worker when it starts.
+    @param initargs: Arguments to @initializer.
+
+    This method creates the pool used by the bulk operations.
+    """
+    if processes:
+        return multiprocessing.Pool(workers, initializer, initargs)
+    return ThreadPool(workers, initializer, initargs)
+
+def bounded_imap(pool, func, iterable, window):
+    """
+    @param pool: Pool object (see make_pool).
+    @param func: Function to apply. Must be picklable when using processes.
+    @param iterable: Any iterable. It is consumed lazily.
+    @param window: Maximum number of tasks in flight.
+
+    This method applies @func to every element of @iterable on @pool,
+    yielding results in input order. Unlike Pool.imap, it never has more
+    than @window pending tasks, so memory stays bounded on huge inputs.
+    """
+    pending = collections.deque()
+    for element in iterable:
+        pending.append(pool.apply_async(func, (element,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
@@ -42,7 +42,7 @@ def validate_url(url):
 
 def validate_required(rnames, kwargs):
     a = set(rnames)
-    b = set(kwargs.keys())
+    b = set(kwargs)
     if len(a-b) > 0:
         msg = 'Required structure {} not provided'.format(a-b)
         raise TypeError(msg)
@@ -0,0 +1,71 @@
+#!/usr/env python
+# -*- coding: utf-8 -*-
+import json
+import asyncio
+import unittest
+from requests.exceptions import HTTPError
+from liblightbase.lbutils.conv import dict2base
+from liblightbase.lbsearch.search import Search
+from liblightbase.tests.fixtures import field
+from liblightbase.tests.rest_server import LBServer
+from liblightbase.lbrest import aio
+
+@unittest.skipIf(aio.aiohttp is None, 'aiohttp is not installed')
+class AsyncRESTTestCase(unittest.TestCase):
+    """
+    Test asyncio REST client
+    """
+
+    def setUp(self):
+        self.base = dict2base({'metadata': {'name': 'pessoa'},
+            'content': [field('nome'), field('idade', 'Integer')]})
+        self.server = LBServer(self.base)
+        for i in range(30):
+            self.server.add({'nome': 'P%d' % i, 'idade': i})
+
+    def tearDown(self):
+        self.server.stop()
+
+    def run_async(self, coroutine):
+        return asyncio.run(coroutine)
+
+    def test_documents(self):
+        async def run():
+            async with aio.AsyncDocumentREST(self.server.rest_url,
+                    self.base) as rest:
+                document = await rest.get(3)
+                self.assertEqual(document.nome, 'P2')
+                id_doc = await rest.create(json.dumps({'nome': 'N'}))
+                self.assertEqual(id_doc, 31)
+                await rest.update(id_doc, json.dumps({'nome': 'M'}))
+                self.assertEqual(json.loads(await rest.get_path(id_doc,
+                    ['nome'])), 'M')
+                await rest.delete(id_doc)
+                with self.assertRaises(HTTPError):
+                    await rest.get(id_doc)
+                collection = await rest.get_collection(Search(limit=5,
+                    offset=10))
+                self.assertEqual(collection.result_count, 30)
+                self.assertEqual([document.idade for document in
+                    collection.results], [10, 11, 12, 13, 14])
+                documents = await asyncio.gather(*[rest.get(i)
+                    for i in range(1, 31)])
+                self.assertEqual([document.idade for document in documents],
+                    list(range(30)))
+            async with aio.AsyncBaseREST(self.server.rest_url) as rest:
+                base = await rest.get('pessoa')
+                self.assertEqual(base.json, self.base.json)
+        self.run_async(run())
+
+    def test_files(self):
+        async def run():
+            async with aio.AsyncFileREST(self.server.rest_url,
+                    self.base) as rest:
+                id_file = await rest.upload(('nome.txt', b'a\x00b'))
+                headers, content = await rest.download(id_file)
+                self.assertEqual(content, b'a\x00b')
+                self.assertEqual(headers['filename'], 'nome.txt')
+        self.run_async(run())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/env python
+# -*- coding: utf-8 -*-
+import json
+import datetime
+import unittest
+from liblightbase.lbutils import exc
+from liblightbase.lbutils.bincodec import BinaryCodec
+from liblightbase.tests.fixtures import field
+from liblightbase.tests.fixtures import base
+
+class BinaryCodecTestCase(unittest.TestCase):
+    """
+    Test binary document encoding
+    """
+
+    def setUp(self):
+        self.content = [
+            field('nome'),
+            field('leituras', 'Integer', multivalued=True),
+            field('valores', 'Decimal', multivalued=True),
+            field('data', 'Date'),
+            field('horas', 'Time', multivalued=True),
+            field('criado', 'DateTime'),
+            field('ativo', 'Boolean'),
+            field('extra', 'Json'),
+            {'group': {'metadata': {'name': 'sensores', 'alias': 'sensores',
+                'description': 'sensores', 'multivalued': True}, 'content': [
+                field('codigo', 'Integer'), field('local')]}},
+        ]
+        self.base = base(self.content, 'medicao')
+        self.codec = BinaryCodec(self.base)
+        self.document = {
+            'nome': u'Estação / 1',
+            'leituras': [0, -1, 300, 2 ** 70],
+            'valores': [1.5, -0.25],
+            'data': '24/06/2014',
+            'horas': ['10:00:00', '23:59:59', '24:00:00'],
+            'criado': '01/05/2014 08:00:01',
+            'ativo': False,
+            'extra': {'a': [None, True, 1.0], 'b': b'\x00',
+                'd': datetime.datetime(2014, 5, 1, 8, 0, 1, 5),
+                'e': datetime.date(2014, 5, 1), 'f': datetime.time(1, 2)},
+            'sensores': [{'codigo': 1, 'local': 'a'}, {'codigo': 2}],
+            '_metadata': {'id_doc': 10, 'dt_doc': '01/05/2014 08:00:01',
+                'dt_last_up': '01/05/2014 08:00:01', 'dt_idx': None,
+                'dt_del': None}
+        }
+
+    def test_round_trip(self):
+        data = self.codec.encode(self.document)
+        self.assertEqual(self.codec.decode(data), self.document)
+        self.assertLess(len(data), len(json.dumps(self.document,
+            default=str)) // 2)
+        document = {'leituras': [1, 2, 3], 'valores': [1.0, 2.0]}
+        self.assertEqual(self.codec.decode(self.codec.encode(document)),
+            document)
+
+    def test_documents(self):
+        del self.document['extra']
+        del self.document['leituras'][-1]
+        del self.document['horas'][-1]
+        data = self.codec.encode(self.document)
+        document = self.codec.decode(data, as_document=True)
+        self.assertIsInstance(document, self.base.metaclass())
+        self.assertEqual(document.sensores[1].codigo, 2)
+        decoded = self.codec.decode(self.codec.encode(document))
+        self.assertEqual(decoded.pop('_metadata')['dt_doc'],
+            datetime.datetime(2014, 5, 1, 8, 0, 1))
+        del self.document['_metadata']
+        self.assertEqual(decoded, self.document)
+
+    def test_stale(self):
+        data = self.codec.encode(self.document)
+        content = list(self.content)
+        content[1] = field('leituras', 'Decimal', multivalued=True)
+        other = BinaryCodec(base(content, 'medicao'))
+        self.assertNotEqual(other.fingerprint, self.codec.fingerprint)
+        self.assertRaises(exc.StaleEncodingError, other.decode, data)
+        self.assertEqual(BinaryCodec(base(self.content, 'medicao')).decode(data),
+            self.document)
+        self.assertRaises(exc.CodecError, self.codec.decode, data[:-1])
+        self.assertRaises(exc.CodecError, self.codec.decode, b'{}')
+        self.assertRaises(exc.CodecError, self.codec.encode, {'outro': 1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/env python
+# -*- coding: utf-8 -*-
+import unittest
+from liblightbase.lbutils.conv import dict2base
+from liblightbase.lbdoc.bulk import BulkPut
+from liblightbase.lbdoc.predicate import compile_predicate
+from liblightbase.tests.fixtures import field
+
+class BulkPutTestCase(unittest.TestCase):
+    """
+    Test compiled predicates and bulk put
+    """
+
+    def setUp(self):
+        self.base = dict2base({'metadata': {'name': 'produto'}, 'content': [
+            field('status'),
+            field('categoria'),
+            field('preco', 'Decimal'),
+            field('tags', multivalued=True),
+        ]})
+        self.documents = [{'categoria': 'Y' if i % 2 else 'X',
+            'preco': float(i), 'tags': ['a', 'b'] if i % 3 else []}
+            for i in range(30)]
+
+    def test_predicate(self):
+        document = {'categoria': 'Y', 'preco': 10.0, 'tags': ['a', 'b']}
+        self.assertTrue(compile_predicate("categoria == 'Y'")(document))
+        self.assertTrue(compile_predicate('preco >= 10 and tags.* == "b"')
+            (document))
+        self.assertFalse(compile_predicate('not (preco > 5) or status == 1')
+            (document))
+        self.assertTrue(compile_predicate('categoria in ["X", "Y"]')(document))
+        self.assertTrue(compile_predicate("categoria not in ['X']")(document))
+        self.assertFalse(compile_predicate('categoria < 1')(document))
+        self.assertRaises(SyntaxError, compile_predicate, 'categoria ==')
+        self.assertRaises(SyntaxError, compile_predicate, 'categoria Y')
+        for literal in ('10px', 'trueish', 'True', '1 2', '[1, 2] 3', '[x]'):
+            self.assertRaises(SyntaxError, compile_predicate,
+                'status == %s' % literal)
+        self.assertTrue(compile_predicate('preco == 1e1')(document))
+
+    def test_bulk_put(self):
+        bulk = BulkPut(self.base, ['status'], 'novo',
+            where="categoria == 'Y' and preco < 20")
+        documents = list(bulk.apply(iter(self.documents), batch_size=7))
+        self.assertEqual(bulk.total, 30)
+        self.assertEqual(bulk.updated, 10)
+        for i, document in enumerate(documents):
+            expected = 'novo' if i % 2 and i < 20 else None
+            self.assertEqual(document.get('status'), expected)
+
+    def test_bulk_put_containers(self):
+        bulk = BulkPut(self.base, ['tags'], '["c"]')
+        documents = list(bulk.apply(self.documents))
+        self.assertEqual(documents[0]['tags'], ['c'])
+        self.assertIsNot(documents[0]['tags'], documents[1]['tags'])
+
+    def test_bulk_put_parallel(self):
+        bulk = BulkPut(self.base, ['tags', '*'], 'z', where='preco > 3')
+        for processes in (False, True):
+            documents = list(bulk.apply(self.documents, workers=2,
+                batch_size=4, processes=processes))
+            self.assertEqual(len(documents), 30)
+            self.assertEqual(bulk.updated, 18)
+            self.assertEqual(documents[4]['tags'], ['z', 'z'])
+            self.assertEqual(documents[2]['tags'], ['a', 'b'])
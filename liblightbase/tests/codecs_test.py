@@ -0,0 +1,84 @@
+#!/usr/env python
+# -*- coding: utf-8 -*-
+import json
+import datetime
+import unittest
+from liblightbase.lbutils import codecs
+
+class Encoded(object):
+
+    def _encoded(self):
+        return {'name': 'encoded', 'values': [1, 2]}
+
+class CodecsTestCase(unittest.TestCase):
+    """
+    Test JSON backends
+    """
+
+    def setUp(self):
+        self.backend = codecs.get_json_backend()
+        self.value = {
+            'text': u'ação / "quoted"',
+            'number': 10,
+            'decimal': 1.5,
+            'none': None,
+            'bool': True,
+            'datetime': datetime.datetime(2014, 5, 30, 10, 20, 30),
+            'date': datetime.date(2014, 5, 30),
+            'time': datetime.time(10, 20, 30),
+            'encoded': Encoded(),
+            'list': [Encoded(), 'x', 2 ** 70]
+        }
+
+    def tearDown(self):
+        codecs.set_json_backend(self.backend)
+
+    def backends(self):
+        return [name for name in codecs.JSON_BACKENDS
+            if codecs._BACKEND_MODULES[name] is not None]
+
+    def test_backends(self):
+        expected = json.loads(codecs.object2json(self.value, indent=4))
+        for name in self.backends():
+            codecs.set_json_backend(name)
+            self.assertEqual(codecs.get_json_backend(), name)
+            dumped = codecs.object2json(self.value)
+            self.assertEqual(json.loads(dumped), expected)
+            self.assertEqual(codecs.json2object(dumped), expected)
+            dumped = codecs.object2json(self.value, as_bytes=True)
+            self.assertIsInstance(dumped, bytes)
+            self.assertEqual(codecs.json2object(dumped), expected)
+            self.assertNotIn('\\u', dumped.decode('utf-8'))
+
+    def test_nonfinite(self):
+        value = {'a': [1.5, float('nan')], 'b': float('-inf'), 'c': None,
+            'd': Encoded()}
+        expected = codecs.object2json(value, indent=None)
+        for name in self.backends():
+            codecs.set_json_backend(name)
+            self.assertEqual(json.loads(codecs.object2json(value)),
+                json.loads(expected))
+            self.assertIn('NaN', codecs.object2json(value))
+            self.assertIn(b'-Infinity', codecs.object2json(value,
+                as_bytes=True))
+        self.assertFalse(codecs._has_nonfinite({'a': [None, 1.5, 'x'],
+            'b': Encoded(), 'c': datetime.date(2014, 5, 30)}))
+
+    def test_decode(self):
+        for name in self.backends():
+            codecs.set_json_backend(name)
+            self.assertEqual(codecs.json2object('{"a": [1, 2.5]}  '),
+                {'a': [1, 2.5]})
+            self.assertEqual(codecs.json2object([1]), [1])
+            self.assertRaises(ValueError, codecs.json2object, '{"a": ')
+            for value in (2 ** 70, -2 ** 63 - 1, 2 ** 64):
+                self.assertEqual(codecs.json2object(str(value)), value)
+                self.assertEqual(codecs.json2object(b'[%d]' % value), [value])
+            self.assertEqual(codecs.json2object('[2.5, 1234567890123456789]'),
+                [2.5, 1234567890123456789])
+
+    def test_invalid_backend(self):
+        self.assertRaises(ValueError, codecs.set_json_backend, 'simplejson')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/env python
+# -*- coding: utf-8 -*-
+import os
+import sys
+import copy
+import shutil
+import tempfile
+import uuid
+import importlib
+import unittest
+from liblightbase.lbutils import exc
+from liblightbase.lbtypes.extended import FileMask
+from liblightbase.lbutils.conv import dict2base
+from liblightbase.lbutils.conv import document2dict
+from liblightbase.lbutils.bincodec import base_fingerprint
+from liblightbase.lbdoc.codegen import write_module
+from liblightbase.tests.fixtures import field
+from liblightbase.tests.fixtures import pessoa
+
+class CodeGenerationTestCase(unittest.TestCase):
+    """
+    Test generated document modules
+    """
+
+    def setUp(self):
+        base = pessoa()
+        base['content'][1]['field']['required'] = False
+        self.base = dict2base(base)
+        self.document = {
+            'nome': 'Antony',
+            'carros': ['x', 'y'],
+            'dependente': {
+                'nome_dep': 'Neymar',
+                'idade_dep': 12,
+                'gmulti': [{'teste': 'a'}, {'teste': 'b'}]
+            }
+        }
+        self.path = tempfile.mkdtemp()
+        write_module(self.base, os.path.join(self.path, 'pessoa_docs.py'))
+        sys.path.insert(0, self.path)
+        self.module = importlib.import_module('pessoa_docs')
+
+    def tearDown(self):
+        sys.path.remove(self.path)
+        del sys.modules['pessoa_docs']
+        shutil.rmtree(self.path)
+
+    def test_module(self):
+        module = self.module
+        self.assertEqual(module.BASE_NAME, 'pessoa')
+        self.assertEqual(module.FINGERPRINT, base_fingerprint(self.base).hex())
+        self.assertEqual(module.get_base().json, self.base.json)
+        self.assertIs(module.CLASSES['gmulti'], module.Gmulti)
+        self.assertRaises(AttributeError, setattr, module.Pessoa(), 'outro', 1)
+        self.assertIn('Group dependente of', module.Dependente.__doc__)
+        self.assertIn('Group gmulti of', module.Gmulti.__doc__)
+
+    def test_round_trip(self):
+        dictobj = copy.deepcopy(self.document)
+        dictobj['_metadata'] = {'id_doc': 1, 'dt_doc': '01/01/2014 10:00:00',
+            'dt_last_up': '01/01/2014 10:00:00'}
+        document = self.module.DOCUMENT.from_dict(dictobj)
+        self.assertIsInstance(document.dependente, self.module.Dependente)
+        self.assertEqual(document.dependente.gmulti[1].teste, 'b')
+        self.assertEqual(document._metadata.id_doc, 1)
+        document.validate()
+        result = document.to_dict()
+        del result['_metadata']
+        self.assertEqual(result, self.document)
+        document = self.module.Pessoa.from_json(document.to_json())
+        self.assertEqual(document2dict(self.base,
+            self.base.converter.dict2document(document.to_dict())),
+            self.document)
+
+    def test_validate(self):
+        Pessoa = self.module.Pessoa
+        self.assertRaises(TypeError, Pessoa().validate)
+        self.assertRaises(exc.ValidationError,
+            Pessoa(nome='x', carros=[1]).validate)
+        self.assertRaises(AssertionError, Pessoa(nome='x', carros='y')
+            .validate)
+        dependente = self.module.Dependente(nome_dep='y', idade_dep='1')
+        self.assertRaises(exc.ValidationError,
+            Pessoa(nome='x', dependente=dependente).validate)
+        dependente.idade_dep = 1
+        Pessoa(nome='x', dependente=dependente).validate()
+
+    def test_file_field(self):
+        base = dict2base({'metadata': {'name': 'arquivo'},
+            'content': [field('nome'), field('anexo', 'File')]})
+        write_module(base, os.path.join(self.path, 'arquivo_docs.py'))
+        module = importlib.import_module('arquivo_docs')
+        try:
+            mask = FileMask(None, 'a.txt', 'text/plain', 10,
+                str(uuid.uuid4()))
+            mask.id_file = uuid.UUID(mask.make_id())
+            mask = mask.__dict__
+            module.Arquivo(nome='x', anexo=mask).validate()
+            mask['filesize'] = 11
+            self.assertRaises(Exception,
+                module.Arquivo(nome='x', anexo=mask).validate)
+        finally:
+            del sys.modules['arquivo_docs']
+
+if __name__ == '__main__':
+    unittest.main()
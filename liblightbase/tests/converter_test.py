@@ -0,0 +1,92 @@
+#!/usr/env python
+# -*- coding: utf-8 -*-
+import copy
+import json
+import unittest
+from liblightbase.lbutils.conv import dict2base
+from liblightbase.lbutils.conv import dict2document
+from liblightbase.lbutils.conv import document2dict
+from liblightbase.lbutils.conv import json2document
+from liblightbase.lbdoc.metadata import DocumentMetadata
+from liblightbase.tests.fixtures import pessoa
+
+class DocumentConverterTestCase(unittest.TestCase):
+    """
+    Test compiled document converters
+    """
+
+    def setUp(self):
+        base = pessoa()
+        base['content'][1]['field']['required'] = False
+        self.base = dict2base(base)
+        self.document = {
+            'nome': 'Antony',
+            'carros': ['x', 'y'],
+            'dependente': {
+                'nome_dep': 'Neymar',
+                'idade_dep': 12,
+                'gmulti': [{'teste': 'a'}, {'teste': 'b'}]
+            }
+        }
+
+    def test_round_trip(self):
+        dictobj = copy.deepcopy(self.document)
+        dictobj['_metadata'] = {'id_doc': 1, 'dt_doc': '01/01/2014 10:00:00',
+            'dt_last_up': '01/01/2014 10:00:00'}
+        document = dict2document(self.base, dictobj)
+        self.assertIn('_metadata', dictobj)
+        self.assertIsInstance(document, self.base.metaclass())
+        self.assertIsInstance(document._metadata, DocumentMetadata)
+        self.assertIsInstance(document.dependente,
+            self.base.metaclass('dependente'))
+        self.assertEqual(document.dependente.gmulti[1].teste, 'b')
+        self.assertEqual(document2dict(self.base, document), self.document)
+        self.assertIs(self.base.converter, self.base.converter)
+
+    def test_partial_documents(self):
+        document = dict2document(self.base, {'nome': 'Antony'})
+        self.assertEqual(document2dict(self.base, document), {'nome': 'Antony'})
+        self.assertEqual(document2dict(self.base, self.document),
+            self.document)
+
+    def test_validation(self):
+        self.assertRaises(TypeError, dict2document, self.base, {'carros': []})
+        self.assertRaises(KeyError, dict2document, self.base,
+            {'nome': 'x', 'outro': 1})
+        document = copy.deepcopy(self.document)
+        document['dependente']['idade_dep'] = 'doze'
+        self.assertRaises(Exception, dict2document, self.base, document)
+        document = dict2document(self.base, self.document)
+        self.assertRaises(AssertionError, document.dependente.gmulti.append,
+            'x')
+
+    def test_json2document(self):
+        dictobj = copy.deepcopy(self.document)
+        dictobj['_metadata'] = {'id_doc': 1, 'dt_doc': '01/01/2014 10:00:00',
+            'dt_last_up': '01/01/2014 10:00:00'}
+        for indent in (None, 2):
+            text = json.dumps(dictobj, indent=indent)
+            for jsonobj in (text, text.encode('utf-8'), ' %s x' % text):
+                document = json2document(self.base, jsonobj)
+                self.assertIsInstance(document, self.base.metaclass())
+                self.assertEqual(document._metadata.id_doc, 1)
+                self.assertEqual(document.dependente.gmulti[0].teste, 'a')
+                self.assertEqual(document2dict(self.base, document),
+                    self.document)
+        document = json2document(self.base,
+            '{"nome": "x", "dependente": {"nome_dep": "y", "gmulti": []}}')
+        self.assertEqual(document.dependente.gmulti, [ ])
+
+    def test_json2document_errors(self):
+        for text in ('{"nome": "x"', '{"nome" "x"}', '{"nome": }', '["x"]',
+                '{"nome": "x", "dependente": {"nome_dep": "y", "gmulti": {}}}'):
+            self.assertRaises(ValueError, json2document, self.base, text)
+        self.assertRaises(KeyError, json2document, self.base,
+            '{"nome": "x", "outro": 1}')
+        self.assertRaises(TypeError, json2document, self.base,
+            '{"dependente": {"nome_dep": "y"}}')
+        self.assertRaises(TypeError, json2document, self.base,
+            '{"nome": "x", "dependente": {}}')
+
+if __name__ == '__main__':
+    unittest.main()
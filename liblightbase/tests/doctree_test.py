@@ -0,0 +1,241 @@
+#!/usr/env python
+# -*- coding: utf-8 -*-
+import copy
+import unittest
+from liblightbase.lbutils.conv import json2base
+from liblightbase.lbdoc import lbpath
+from liblightbase.lbdoc.doctree import DocumentTree
+from liblightbase.tests.fixtures import PESSOA_JSON
+
+class DocumentTreeTestCase(unittest.TestCase):
+    """
+    Test document tree path operations
+    """
+
+    def setUp(self):
+        """
+        Load test data
+        :return:
+        """
+        self.base = json2base(PESSOA_JSON)
+        self.document = {
+            'nome': 'Antony',
+            'carros': ['x', 'y', 'z'],
+            'dependente': {
+                'nome_dep': 'Neymar',
+                'idade_dep': 12,
+                'gmulti': [{'teste': 'a'}, {'teste': 'b'}, {'teste': 'c'}]
+            }
+        }
+
+    def doc(self):
+        return copy.deepcopy(self.document)
+
+    def test_get_path(self):
+        self.assertEqual(self.base.get_path(self.doc(), ['nome']), 'Antony')
+        self.assertEqual(self.base.get_path(self.doc(), ['carros', '1']), 'y')
+        self.assertEqual(self.base.get_path(self.doc(),
+            ['dependente', 'gmulti', '*', 'teste']), {
+                'dependente.gmulti.[0].teste': 'a',
+                'dependente.gmulti.[1].teste': 'b',
+                'dependente.gmulti.[2].teste': 'c'})
+        self.assertRaises(IndexError, self.base.get_path, self.doc(),
+            ['carros', '5'])
+
+    def test_set_path(self):
+        index, document = self.base.set_path(self.doc(), ['carros'], 'w')
+        self.assertEqual(document['carros'], ['x', 'y', 'z', 'w'])
+        index, document = self.base.set_path(self.doc(),
+            ['dependente', 'gmulti'], '{"teste": "d"}')
+        self.assertEqual(document['dependente']['gmulti'][-1], {'teste': 'd'})
+
+    def test_set_path_create(self):
+        document = self.doc()
+        del document['carros']
+        index, document = self.base.set_path(document, ['carros'], 'w')
+        self.assertEqual(document['carros'], ['w'])
+
+    def test_put_path(self):
+        document = self.base.put_path(self.doc(), ['dependente', 'idade_dep'],
+            '13')
+        self.assertEqual(document['dependente']['idade_dep'], 13)
+        document = self.base.put_path(self.doc(),
+            ['dependente', 'gmulti', '*', 'teste'], 'k',
+            fn=lambda value: value != 'b')
+        self.assertEqual(document['dependente']['gmulti'],
+            [{'teste': 'k'}, {'teste': 'b'}, {'teste': 'k'}])
+        document = self.base.put_path(self.doc(), ['carros'], '["a"]')
+        self.assertEqual(document['carros'], ['a'])
+        self.assertRaises(IndexError, self.base.put_path, self.doc(),
+            ['carros', '9'], 'a')
+
+    def test_delete_path(self):
+        document = self.base.delete_path(self.doc(), ['carros', '1'])
+        self.assertEqual(document['carros'], ['x', 'z'])
+        document = self.base.delete_path(self.doc(), ['carros', '*'])
+        self.assertEqual(document['carros'], [])
+        document = self.base.delete_path(self.doc(), ['dependente', 'gmulti',
+            '*', 'teste'])
+        self.assertEqual(document['dependente']['gmulti'], [{}, {}, {}])
+        document = self.base.delete_path(self.doc(), ['dependente'])
+        self.assertNotIn('dependente', document)
+
+    def test_prune(self):
+        pruned = DocumentTree(self.doc(), self.base).prune(
+            nodes=['teste', 'nome'])
+        self.assertEqual(pruned, {'nome': 'Antony', 'dependente': {'gmulti':
+            [{'teste': 'a'}, {'teste': 'b'}, {'teste': 'c'}]}})
+
+    def test_path_cache(self):
+        steps = lbpath.compile_path(['dependente', 'gmulti', '*', 'teste'])
+        self.assertIs(lbpath.compile_path(('dependente', 'gmulti', '*',
+            'teste')), steps)
+        self.assertIn(('dependente', 'gmulti', '*', 'teste'),
+            lbpath.PATH_CACHE)
+
+    def test_indexed_paths(self):
+        document = self.base.put_path(self.doc(),
+            ['dependente', 'gmulti', '1', 'teste'], 'k')
+        self.assertEqual(document['dependente']['gmulti'][1], {'teste': 'k'})
+        self.assertEqual(self.base.get_path(self.doc(),
+            ['dependente', 'gmulti', 2]), {'teste': 'c'})
+        self.assertRaises(IndexError, self.base.get_path, self.doc(),
+            ['dependente', 'nome_dep', '*'])
+
+    def test_create_nested_path(self):
+        document = self.doc()
+        document['dependente']['gmulti'] = [{}]
+        document = self.base.put_path(document,
+            ['dependente', 'gmulti', '0', 'teste'], 'x')
+        self.assertEqual(document['dependente']['gmulti'], [{'teste': 'x'}])
+
+    def test_create_missing_structures(self):
+        document = self.doc()
+        document['dependente']['gmulti'] = [{'teste': 'a'}, { }]
+        result = self.base.put_path(document,
+            ['dependente', 'gmulti', '*', 'teste'], 'k',
+            fn=lambda value: value == 'a')
+        self.assertEqual(result['dependente']['gmulti'], [{'teste': 'k'}, { }])
+        result = self.base.put_path(document,
+            ['dependente', 'gmulti', '*', 'teste'], 'k')
+        self.assertEqual(result['dependente']['gmulti'], [{'teste': 'k'}, { }])
+
+        # Missing structures are only inserted by accepted writes
+        del document['dependente']
+        result = self.base.put_path(document, ['dependente', 'nome_dep'], 'z',
+            fn=lambda value: value is not None)
+        self.assertNotIn('dependente', result)
+        result = self.base.put_path(document, ['dependente', 'nome_dep'], 'z')
+        self.assertEqual(result['dependente'], {'nome_dep': 'z'})
+        index, result = self.base.set_path(document, ['dependente', 'gmulti'],
+            '{"teste": "d"}')
+        self.assertEqual(result['dependente'], {'gmulti': [{'teste': 'd'}]})
+        self.assertRaises(AttributeError, self.base.set_path, document,
+            ['dependente', 'nome_dep'], 'z', inplace=True)
+        self.assertNotIn('dependente', document)
+
+    def test_inplace(self):
+        document = self.doc()
+        gmulti = document['dependente']['gmulti']
+        result = self.base.put_path(document, ['dependente', 'gmulti', '*',
+            'teste'], 'k', inplace=True)
+        self.assertIs(result, document)
+        self.assertIs(result['dependente']['gmulti'], gmulti)
+        self.assertEqual(gmulti, [{'teste': 'k'}] * 3)
+
+        del document['carros']
+        index, result = self.base.set_path(document, ['carros'], 'w',
+            inplace=True)
+        self.assertIs(result, document)
+        self.assertEqual(document['carros'], ['w'])
+        self.assertIs(type(document['carros']), list)
+
+        result = self.base.delete_path(document, ['nome'], inplace=True)
+        self.assertIs(result, document)
+        self.assertNotIn('nome', document)
+
+        # Failed operations leave the document unchanged
+        document = {'nome': 'A'}
+        self.assertRaises(IndexError, self.base.put_path, document,
+            ['dependente', 'gmulti', '0', 'teste'], 'k', inplace=True)
+        self.assertEqual(document, {'nome': 'A'})
+        document = self.doc()
+        self.assertRaises(ZeroDivisionError, self.base.put_path, document,
+            ['dependente', 'gmulti', '*', 'teste'], 'k', inplace=True,
+            fn=lambda value: value == 'a' or 1 / 0)
+        self.assertEqual(document, self.document)
+
+    def test_apply_paths(self):
+        document = self.base.apply_paths(self.doc(), [
+            ('put', ['nome'], 'Tony'),
+            ('set', ['carros'], 'w'),
+            ('delete', ['carros', '0']),
+            ('put', ['dependente', 'gmulti', '*', 'teste'], 'k',
+                lambda value: value == 'a'),
+        ])
+        self.assertEqual(document['nome'], 'Tony')
+        self.assertEqual(document['carros'], ['y', 'z', 'w'])
+        self.assertEqual(document['dependente']['gmulti'][0], {'teste': 'k'})
+
+    def test_apply_paths_rollback(self):
+        for inplace in (False, True):
+            document = self.doc()
+            del document['dependente']['idade_dep']
+            before = copy.deepcopy(document)
+            self.assertRaises(IndexError, self.base.apply_paths, document, [
+                ('put', ['dependente', 'idade_dep'], '13'),
+                ('put', ['dependente', 'gmulti', '0', 'teste'], 'k'),
+                ('set', ['carros'], 'w'),
+                ('delete', ['dependente', 'gmulti', '*']),
+                ('delete', ['carros', '*']),
+                ('delete', ['carros', '9']),
+            ], inplace=inplace)
+            self.assertEqual(document, before)
+
+    def test_projection(self):
+        document = self.doc()
+        document['_metadata'] = {'id_doc': 1}
+        projection = self.base.projection(['teste', 'nome'])
+        self.assertIs(self.base.projection(('nome', 'teste')), projection)
+        self.assertEqual(projection.branches, set(['dependente', 'gmulti']))
+        projected = projection.project(document)
+        self.assertEqual(projected, {'nome': 'Antony', 'dependente': {'gmulti':
+            [{'teste': 'a'}, {'teste': 'b'}, {'teste': 'c'}]}})
+
+        # Values are shared
+        projected = self.base.projection(['carros']).project(document)
+        self.assertIs(projected['carros'], document['carros'])
+
+        # Metadata nodes are searched out of the base structures
+        projected = self.base.projection(['id_doc', 'nome_dep']).project(
+            document)
+        self.assertEqual(projected, {'_metadata': {'id_doc': 1},
+            'dependente': {'nome_dep': 'Neymar'}})
+        self.assertIsNone(self.base.projection(['teste']).project(
+            {'nome': 'x'}))
+
+    def test_delete_large_array(self):
+        document = self.doc()
+        document['carros'] = [str(i) for i in range(20000)]
+        document['dependente']['gmulti'] = [{'teste': str(i)}
+            for i in range(20)]
+        document = self.base.delete_path(document, ['carros', '*'],
+            inplace=True)
+        self.assertEqual(document['carros'], [])
+        document = self.base.delete_path(document, ['dependente', 'gmulti',
+            '12'], inplace=True)
+        self.assertEqual([element['teste'] for element in
+            document['dependente']['gmulti']],
+            [str(i) for i in range(20) if i != 12])
+
+    def test_iter_path(self):
+        document = self.doc()
+        document['carros'] = [str(i) for i in range(1000)]
+        matches = self.base.iter_path(document, ['carros', '*'])
+        self.assertEqual(next(matches), (('carros', 0), '0'))
+        self.assertEqual(next(matches), (('carros', 1), '1'))
+        self.assertEqual(list(self.base.iter_path(self.doc(),
+            ['dependente', 'gmulti', '*', 'teste'], as_str=True))[-1],
+            ('dependente.gmulti.[2].teste', 'c'))
+        self.assertEqual(list(self.base.iter_path(self.doc(),
+            ['dependente', 'nome'])), [])
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+Base and structure definitions shared by test modules.
+"""
+import json
+from liblightbase.lbutils.conv import dict2base
+
+# @property PESSOA_JSON: Base with nested groups used by path and document
+# tests: pessoa {nome, carros*, dependente {gmulti* {teste}, nome_dep,
+# idade_dep}}.
+PESSOA_JSON = '''{"metadata":{"id_base":5,"dt_base":"10/05/2014 10:21:49","file_ext":false,"idx_exp":false,"idx_exp_url":"","idx_exp_time":"0","file_ext_time":"0","name":"pessoa","description":"qqqqqqq","password":"qqqqqqqq","color":""},"content":[{"field":{"name":"nome","alias":"c5","description":"efdewf","datatype":"Text","required":true,"multivalued":false,"indices":["Textual"]}},{"field":{"name":"carros","alias":"","description":"","datatype":"Text","required":true,"multivalued":true,"indices":["Textual"]}},{"group":{"metadata":{"name":"dependente","alias":"c3","description":"yrjt","multivalued":false},"content":[{"group":{"metadata":{"name":"gmulti","alias":"c3","description":"yrjt","multivalued":true},"content":[{"field":{"name":"teste","alias":"c1","description":"gtrgtr","datatype":"Text","required":false,"multivalued":false,"indices":["Textual"]}}]}},{"field":{"name":"nome_dep","alias":"c1","description":"gtrgtr","datatype":"Text","required":true,"multivalued":false,"indices":["Textual"]}},{"field":{"name":"idade_dep","alias":"c2","description":"rgregetg","datatype":"Integer","required":false,"multivalued":false,"indices":["Textual"]}}]}}]}'''
+
+def pessoa():
+    """ Return PESSOA_JSON as a new dictionary, to be changed by tests
+    """
+    return json.loads(PESSOA_JSON)
+
+def field(name, datatype='Text', multivalued=False, required=False):
+    return {'field': {'name': name, 'alias': name, 'description': name,
+        'datatype': datatype, 'indices': ['Textual'],
+        'multivalued': multivalued, 'required': required}}
+
+def group(name, content, multivalued=False):
+    return {'group': {'metadata': {'name': name, 'alias': name,
+        'description': name, 'multivalued': multivalued}, 'content': content}}
+
+def base(content, name='pessoa'):
+    return dict2base({'metadata': {'name': name}, 'content': content})
@@ -0,0 +1,82 @@
+#!/usr/env python
+# -*- coding: utf-8 -*-
+import datetime
+import unittest
+from liblightbase.lbutils.conv import dataset2base
+from liblightbase.lbutils.conv import dict2document
+from liblightbase.lbutils.inference import SchemaInferrer
+
+class Address(object):
+
+    def __init__(self, street, number):
+        self.street = street
+        self.number = number
+
+class Person(object):
+
+    def __init__(self, name, address):
+        self.name = name
+        self.address = address
+
+class SchemaInferenceTestCase(unittest.TestCase):
+    """
+    Test base inference from samples
+    """
+
+    def samples(self):
+        for i in range(100):
+            yield {
+                'nome': 'Pessoa %d' % i,
+                'idade': i if i % 2 else float(i),
+                'ativo': i % 3 == 0,
+                'nascimento': datetime.date(1980, 1, 1) if i % 5 else
+                    datetime.datetime(1980, 1, 1, 10),
+                'telefones': [str(i)] * (i % 3),
+                'codigo': 'x' if i == 50 else i,
+                'extra': {'a': 1} if i % 2 else [[1]],
+                'dependentes': [{'nome_dep': 'D', 'idade_dep': i}] if i % 4
+                    else None,
+                'endereco': {'rua': 'R'} if i < 50 else {'cep': i},
+            }
+
+    def check(self, base):
+        struct = base.get_struct
+        self.assertEqual(struct('nome').datatype, 'Text')
+        self.assertEqual(struct('idade').datatype, 'Decimal')
+        self.assertEqual(struct('ativo').datatype, 'Boolean')
+        self.assertEqual(struct('nascimento').datatype, 'DateTime')
+        self.assertTrue(struct('telefones').multivalued)
+        self.assertEqual(struct('codigo').datatype, 'Text')
+        self.assertEqual(struct('extra').datatype, 'Json')
+        self.assertTrue(struct('dependentes').is_group)
+        self.assertTrue(struct('dependentes').metadata.multivalued)
+        self.assertEqual(struct('idade_dep').datatype, 'Integer')
+        self.assertFalse(struct('endereco').metadata.multivalued)
+        self.assertEqual(base.content.__snames__[:3],
+            ['nome', 'idade', 'ativo'])
+        self.assertEqual(struct('endereco').content.__snames__, ['rua', 'cep'])
+
+    def test_infer(self):
+        self.check(dataset2base('pessoa', self.samples()))
+
+    def test_infer_parallel(self):
+        for processes in (False, True):
+            inferrer = SchemaInferrer().infer(self.samples(), workers=2,
+                batch_size=7, processes=processes)
+            self.assertEqual(inferrer.count, 100)
+            self.check(inferrer.base('pessoa'))
+
+    def test_objects(self):
+        base = dataset2base('person', [Person('A', Address('R', 1)),
+            Person('B', None)])
+        self.assertTrue(base.get_struct('address').is_group)
+        self.assertEqual(base.get_struct('number').datatype, 'Integer')
+        dict2document(base, {'name': 'A', 'address': {'number': 1}})
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, dataset2base, 'x', [ ])
+        self.assertRaises(ValueError, dataset2base, 'x',
+            [{'nome': 'a', 'grupo': {'nome': 'b'}}])
+
+if __name__ == '__main__':
+    unittest.main()
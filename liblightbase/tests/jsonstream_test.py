@@ -0,0 +1,78 @@
+#!/usr/env python
+# -*- coding: utf-8 -*-
+import json
+import time
+import unittest
+from liblightbase.lbutils.conv import dict2base
+from liblightbase.lbutils.jsonstream import JSONObjectStream
+from liblightbase.lbsearch.search import StreamingCollection
+from liblightbase.tests.fixtures import field
+
+def split(text, size):
+    data = text.encode('utf-8')
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+class JSONStreamTestCase(unittest.TestCase):
+    """
+    Test incremental decoding of collections
+    """
+
+    def setUp(self):
+        self.results = [{'nome': u'José %d' % i, 'idade': 1234567 * i,
+            '_metadata': {'id_doc': i,
+            'dt_doc': '01/01/2014 10:00:00',
+            'dt_last_up': '01/01/2014 10:00:00'}} for i in range(20)]
+        self.text = json.dumps({'limit': None, 'results': self.results,
+            'result_count': 20, 'offset': 0}, ensure_ascii=False, indent=2)
+
+    def test_chunks(self):
+        for size in (1, 3, 7, 4096):
+            stream = JSONObjectStream(split(self.text, size), 'results')
+            self.assertEqual(list(stream), self.results)
+            self.assertEqual(stream.count, 20)
+            self.assertEqual(stream.members,
+                {'limit': None, 'result_count': 20, 'offset': 0})
+
+    def test_split_numbers(self):
+        for chunks in (['{"a": [1.', '5]}'],
+                ['{"a": [2e', '3, -', '1E+', '2]}'],
+                ['{"a": [1', '2', '3.', '0', '1]}']):
+            stream = JSONObjectStream(chunks, 'a')
+            self.assertEqual(list(stream), json.loads(''.join(chunks))['a'])
+
+    def test_big_values(self):
+        results = [{'nome': 'x' * 100, 'itens': list(range(200000))}]
+        text = json.dumps({'results': results})
+        start = time.time()
+        stream = JSONObjectStream(split(text, 4096), 'results')
+        self.assertEqual(list(stream), results)
+        # Decoding doesn't grow quadratically with value size
+        self.assertLess(time.time() - start, 1)
+
+    def test_empty_and_invalid(self):
+        stream = JSONObjectStream(['{"results": [], "a": [1, ', '2]}'],
+            'results')
+        self.assertEqual(list(stream), [ ])
+        self.assertEqual(stream.members, {'a': [1, 2]})
+        self.assertEqual(list(JSONObjectStream([' {} '], 'results')), [ ])
+        stream = JSONObjectStream(['{"results": [1, 2'], 'results')
+        self.assertRaises(ValueError, list, stream)
+        stream = JSONObjectStream(['[1, 2]'], 'results')
+        self.assertRaises(ValueError, list, stream)
+
+    def test_streaming_collection(self):
+        base = dict2base({'metadata': {'name': 'pessoa'},
+            'content': [field('nome'), field('idade', 'Integer')]})
+        closed = [ ]
+        collection = StreamingCollection(base, split(self.text, 10),
+            lambda: closed.append(True))
+        self.assertEqual(collection.result_count, None)
+        documents = list(collection)
+        self.assertEqual(len(documents), 20)
+        self.assertIsInstance(documents[3], base.metaclass())
+        self.assertEqual(documents[3].idade, 1234567 * 3)
+        self.assertEqual(collection.result_count, 20)
+        self.assertEqual(closed, [True])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/env python
+# -*- coding: utf-8 -*-
+import typing
+import datetime
+import unittest
+import dataclasses
+from liblightbase.lbutils.conv import pyobject2base
+from liblightbase.lbutils.mapper import ObjectMapper
+
+class Teacher(object):
+
+    def __init__(self, name, title):
+        self.name = name
+        self.title = title
+
+class School(object):
+
+    def __init__(self, school_name, foundation, courses, teachers, address):
+        self.school_name = school_name
+        self.foundation = foundation
+        self.courses = courses
+        self.teachers = teachers
+        self.address = address
+
+@dataclasses.dataclass
+class Item(object):
+    description: str
+    price: float = 0.0
+
+@dataclasses.dataclass
+class Order(object):
+    code: int
+    items: typing.List[Item]
+    created: datetime.datetime = None
+    tags: list = dataclasses.field(default_factory=list)
+
+class ObjectMapperTestCase(unittest.TestCase):
+    """
+    Test object mappers
+    """
+
+    def setUp(self):
+        self.school = School('Escola', datetime.datetime(2014, 8, 2, 10, 0),
+            ['A', 'B'], [Teacher('P1', 'Dr'), Teacher('P2', 'Ms')],
+            {'street': 'Rua', 'number': 1})
+        self.base = pyobject2base(self.school)
+
+    def test_plain_class(self):
+        mapper = ObjectMapper(School, self.base, {'teachers': Teacher})
+        document = mapper.to_document(self.school)
+        self.assertIsInstance(document, self.base.metaclass())
+        self.assertEqual(document.foundation, '02/08/2014 10:00:00')
+        self.assertEqual(document.teachers[1].title, 'Ms')
+        school = mapper.from_document(document)
+        self.assertIsInstance(school, School)
+        self.assertEqual(school.foundation, self.school.foundation)
+        self.assertIsInstance(school.teachers[0], Teacher)
+        self.assertEqual(school.teachers[1].name, 'P2')
+        self.assertEqual(school.address, {'street': 'Rua', 'number': 1})
+        self.assertEqual(school.courses, ['A', 'B'])
+        self.school.courses = None
+        schools = list(mapper.from_documents(mapper.to_documents(
+            [self.school] * 3)))
+        self.assertEqual(len(schools), 3)
+        self.assertIsNone(schools[2].courses)
+
+    def test_dataclass(self):
+        order = Order(1, [Item('x', 1.5), Item('y')],
+            datetime.datetime(2014, 1, 2, 3, 4, 5), ['a'])
+        mapper = ObjectMapper(Order, pyobject2base(order))
+        self.assertEqual(mapper.to_dict(order), {'code': 1,
+            'items': [{'description': 'x', 'price': 1.5},
+                {'description': 'y', 'price': 0.0}],
+            'created': '02/01/2014 03:04:05', 'tags': ['a']})
+        self.assertEqual(mapper.from_document(mapper.to_document(order)),
+            order)
+        self.assertEqual(mapper.from_dict({'code': 2, 'items': []}),
+            Order(2, []))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/env python
+# -*- coding: utf-8 -*-
+import copy
+import unittest
+from liblightbase.lbutils.exc import MigrationError
+from liblightbase.lbutils.migration import Migration
+from liblightbase.tests.fixtures import field
+from liblightbase.tests.fixtures import group
+from liblightbase.tests.fixtures import base
+
+class MigrationTestCase(unittest.TestCase):
+    """
+    Test document migration between base versions
+    """
+
+    def setUp(self):
+        self.old_base = base([
+            field('nome'),
+            field('idade', 'Text'),
+            field('apelido'),
+            field('email', multivalued=True),
+            group('dependente', [field('nome_dep'), field('obs')],
+                multivalued=True),
+        ])
+        self.new_base = base([
+            field('nome_completo', required=True),
+            field('idade', 'Integer'),
+            field('email'),
+            field('telefone', multivalued=True),
+            group('dependentes', [field('nome_dep', multivalued=True)],
+                multivalued=True),
+        ])
+        self.migration = Migration(self.old_base, self.new_base,
+            renames={'nome': 'nome_completo', 'dependente': 'dependentes'},
+            defaults={'telefone': []})
+        self.document = {
+            '_metadata': {'id_doc': 1},
+            'nome': 'Antony',
+            'idade': '30',
+            'apelido': 'Tony',
+            'email': ['antony@example.com'],
+            'dependente': [{'nome_dep': 'Neymar', 'obs': 'x'}],
+        }
+
+    def test_migrate(self):
+        document = copy.deepcopy(self.document)
+        newdoc = self.migration.migrate(document)
+        self.assertEqual(newdoc, {
+            '_metadata': {'id_doc': 1},
+            'nome_completo': 'Antony',
+            'idade': 30,
+            'email': 'antony@example.com',
+            'telefone': [],
+            'dependentes': [{'nome_dep': ['Neymar']}],
+        })
+        # Source document is left untouched
+        self.assertEqual(document, self.document)
+
+    def test_defaults_not_shared(self):
+        first, second = list(self.migration.run([self.document] * 2))
+        first['telefone'].append('5555-5555')
+        self.assertEqual(second['telefone'], [])
+        self.assertEqual(self.migration.defaults['telefone'], [])
+
+    def test_run(self):
+        bad = copy.deepcopy(self.document)
+        bad['_metadata'] = {'id_doc': 2}
+        bad['email'] = ['a@example.com', 'b@example.com']
+        documents = [self.document, bad] + [self.document] * 10
+        migrated = list(self.migration.run(iter(documents), batch_size=3,
+            validate=True))
+        report = self.migration.report
+        self.assertEqual(len(migrated), 11)
+        self.assertEqual(report.total, 12)
+        self.assertEqual(report.migrated, 11)
+        self.assertEqual(report.failed, 1)
+        self.assertEqual(report.failures[0][:2], (1, 2))
+
+    def test_run_parallel(self):
+        documents = [self.document] * 20
+        serial = list(self.migration.run(documents))
+        for processes in (False, True):
+            parallel = list(self.migration.run(documents, workers=2,
+                batch_size=3, processes=processes))
+            self.assertEqual(parallel, serial)
+            self.assertEqual(self.migration.report.migrated, 20)
+
+    def test_moved_structure(self):
+        new_base = base([field('nome'), group('dados', [field('idade')])])
+        self.assertRaises(MigrationError, Migration, self.old_base, new_base)
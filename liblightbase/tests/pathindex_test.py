@@ -0,0 +1,59 @@
+#!/usr/env python
+# -*- coding: utf-8 -*-
+import unittest
+from liblightbase.lbutils.conv import dict2base
+from liblightbase.lbtypes import standard
+from liblightbase.tests.fixtures import pessoa
+
+class PathIndexTestCase(unittest.TestCase):
+    """
+    Test base structure path index
+    """
+
+    def setUp(self):
+        """
+        Load test data
+        :return:
+        """
+        base = pessoa()
+        base['content'][0]['field']['indices'] = ['Textual', 'Ordenado']
+        dependente = base['content'][2]['group']['content']
+        dependente[2]['field']['indices'] = ['Unico']
+        self.base = dict2base(base)
+
+    def test_paths(self):
+        teste = self.base.get_struct_path('teste')
+        self.assertEqual(teste.path, ('dependente', 'gmulti', 'teste'))
+        self.assertEqual(teste.parent, 'gmulti')
+        self.assertEqual(teste.ancestors_multivalued, (False, True))
+        self.assertEqual(teste.dim, 1)
+        self.assertEqual(teste.datatype, standard.Text)
+        self.assertTrue(teste.is_field)
+
+        gmulti = self.base.get_struct_path('gmulti')
+        self.assertTrue(gmulti.is_group)
+        self.assertTrue(gmulti.multivalued)
+        self.assertEqual(gmulti.dim, 1)
+        self.assertIsNone(gmulti.datatype)
+
+        carros = self.base.get_struct_path('carros')
+        self.assertEqual(carros.path, ('carros',))
+        self.assertIsNone(carros.parent)
+        self.assertEqual(carros.dim, 1)
+
+    def test_dim_matches_dict2base(self):
+        for sname, spath in self.base.__pathindex__.items():
+            if spath.is_field:
+                self.assertEqual(spath.dim, spath.struct.__dim__)
+
+    def test_relational_fields(self):
+        self.assertEqual(sorted(self.base.relational_fields),
+            ['idade_dep', 'nome'])
+
+    def test_children(self):
+        names = [spath.name for spath in
+            self.base.__pathindex__.children('dependente')]
+        self.assertEqual(names, ['gmulti', 'nome_dep', 'idade_dep'])
+
+    def test_unknown_struct(self):
+        self.assertRaises(KeyError, self.base.get_struct_path, 'unknown')
@@ -0,0 +1,106 @@
+#!/usr/env python
+# -*- coding: utf-8 -*-
+import unittest
+from requests.exceptions import HTTPError
+from liblightbase.lbrest import core
+from liblightbase.lbrest.document import DocumentREST
+from liblightbase.lbsearch.search import Search
+from liblightbase.lbutils.conv import dict2base
+from liblightbase.lbutils.conv import dict2document
+from liblightbase.tests.fixtures import field
+from liblightbase.tests.rest_server import LBServer
+
+class RESTBulkTestCase(unittest.TestCase):
+    """
+    Test bulk document REST operations
+    """
+
+    def setUp(self):
+        self.base = dict2base({'metadata': {'name': 'pessoa'},
+            'content': [field('nome'), field('idade', 'Integer')]})
+        self.server = LBServer(self.base)
+        self.rest = DocumentREST(self.server.rest_url, self.base)
+
+    def tearDown(self):
+        core.close_sessions()
+        self.server.stop()
+
+    def test_bulk(self):
+        documents = [{'nome': 'P%d' % i, 'idade': i} for i in range(40)]
+        documents[5] = dict2document(self.base, documents[5])
+        operation = self.rest.create_many(iter(documents), workers=4)
+        outcomes = list(operation)
+        self.assertEqual([outcome.position for outcome in outcomes],
+            list(range(40)))
+        self.assertEqual(operation.succeeded, 40)
+        self.assertEqual(sorted(outcome.result for outcome in outcomes),
+            list(range(1, 41)))
+        for outcome in outcomes:
+            self.assertEqual(self.server.documents[outcome.result]['idade'],
+                outcome.position)
+
+        operation = self.rest.update_many(((i, {'nome': 'N'})
+            for i in (1, 2, 99, 3)), workers=2).run()
+        self.assertEqual((operation.total, operation.failed), (4, 1))
+        failure = operation.failures[0]
+        self.assertEqual((failure.position, failure.item[0]), (2, 99))
+        self.assertIsInstance(failure.error, HTTPError)
+        self.assertEqual(self.server.documents[3]['nome'], 'N')
+
+        operation = self.rest.delete_many(range(1, 21), workers=1).run()
+        self.assertEqual(operation.succeeded, 20)
+        self.assertEqual(sorted(self.server.documents), list(range(21, 41)))
+
+    def test_iter_collection(self):
+        for i in range(25):
+            self.server.add({'nome': 'P%d' % i, 'idade': i})
+        search = Search(limit=4, offset=2)
+        for prefetch in (0, 1, 3):
+            del self.server.requests[:]
+            documents = list(self.rest.iter_collection(search,
+                prefetch=prefetch))
+            self.assertEqual([document.idade for document in documents],
+                list(range(2, 25)))
+            self.assertEqual(len(self.server.requests), 6)
+        self.assertEqual((search.offset, search.limit), (2, 4))
+        documents = self.rest.iter_collection(Search(limit=None))
+        self.assertEqual(len(list(documents)), 25)
+        documents = self.rest.iter_collection(page_size=10, prefetch=2)
+        self.assertEqual(next(documents).idade, 0)
+        documents.close()
+        self.assertEqual(list(self.rest.iter_collection(Search(offset=30))),
+            [ ])
+
+    def test_cache(self):
+        for i in range(3):
+            self.server.add({'nome': 'P%d' % i, 'idade': i})
+        rest = DocumentREST(self.server.rest_url, self.base, cache=2)
+        document = rest.get(1)
+        self.assertIs(rest.get(1), document)
+        self.assertEqual((rest.cache.hits, rest.cache.misses), (1, 1))
+        self.assertEqual(self.server.requests[-1][1],
+            '/api/pessoa/doc/1/_metadata/dt_last_up')
+
+        # Changed by another client
+        self.rest.update(1, '{"nome": "Q", "idade": 7}')
+        self.assertEqual(rest.get(1).idade, 7)
+        self.assertEqual(rest.stale, 1)
+
+        # Changed by this client
+        rest.update(1, '{"nome": "Q", "idade": 8}')
+        self.assertNotIn(rest._cache_key(1), rest.cache)
+        self.assertEqual(rest.get(1).idade, 8)
+        rest.get(2)
+        rest.get(3)
+        self.assertEqual(rest.cache.evictions, 1)
+        self.assertEqual(len(rest.cache), 2)
+
+        # Deleted by another client
+        self.rest.delete(3)
+        self.assertRaises(HTTPError, rest.get, 3)
+        self.assertNotIn(rest._cache_key(3), rest.cache)
+        rest.delete_many([2]).run()
+        self.assertEqual(len(rest.cache), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/env python
+# -*- coding: utf-8 -*-
+import time
+import unittest
+from requests.exceptions import HTTPError
+from requests.exceptions import Timeout
+from requests.exceptions import TooManyRedirects
+from liblightbase.lbrest import core
+from liblightbase.lbrest.document import DocumentREST
+from liblightbase.lbrest.retry import RetryPolicy
+from liblightbase.lbrest.retry import CircuitBreaker
+from liblightbase.lbrest.retry import CircuitOpenError
+from liblightbase.lbutils.conv import dict2base
+from liblightbase.tests.fixtures import field
+from liblightbase.tests.rest_server import LBServer
+
+class RESTRetryTestCase(unittest.TestCase):
+    """
+    Test REST timeouts, retries and circuit breaker
+    """
+
+    def setUp(self):
+        self.base = dict2base({'metadata': {'name': 'pessoa'},
+            'content': [field('nome'), field('idade', 'Integer')]})
+        self.server = LBServer(self.base)
+        self.server.add({'nome': 'P', 'idade': 1})
+
+    def tearDown(self):
+        core.close_sessions()
+        self.server.stop()
+
+    def test_retry(self):
+        rest = DocumentREST(self.server.rest_url, self.base,
+            retry=RetryPolicy(retries=2, backoff=0.01))
+        self.server.failures = 2
+        self.assertEqual(rest.get(1).idade, 1)
+        self.assertEqual(len(self.server.requests), 3)
+
+        # Retries exhausted: last response is returned
+        self.server.failures = 3
+        self.assertRaises(HTTPError, rest.get, 1)
+        self.assertEqual(len(self.server.requests), 6)
+
+        # POST is not idempotent
+        self.server.failures = 1
+        self.assertRaises(HTTPError, rest.create, '{"nome": "Q"}')
+        self.assertEqual(len(self.server.requests), 7)
+
+    def test_backoff(self):
+        policy = RetryPolicy(backoff=1, max_backoff=5)
+        for attempt in range(6):
+            delay = policy.delay(attempt)
+            self.assertTrue(0 <= delay <= min(5, 2 ** attempt))
+        self.assertFalse(policy.retriable('post'))
+
+    def test_timeout(self):
+        self.server.delay = 0.5
+        rest = DocumentREST(self.server.rest_url, self.base, timeout=0.1)
+        self.assertRaises(Timeout, rest.get, 1)
+        rest.timeout = None
+        self.assertEqual(rest.send_request(rest.httpget,
+            ['pessoa', 'doc', '1', 'idade'], timeout=2), '1')
+
+    def test_deadline(self):
+        self.server.delay = 0.1
+        self.server.failures = 100
+        rest = DocumentREST(self.server.rest_url, self.base,
+            retry=RetryPolicy(retries=100, backoff=0.01, max_backoff=0.01))
+        start = time.monotonic()
+        self.assertRaises((HTTPError, Timeout), rest.send_request,
+            rest.httpget, ['pessoa', 'doc', '1'], deadline=0.5)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertLess(len(self.server.requests), 10)
+
+    def test_circuit_breaker(self):
+        breaker = CircuitBreaker(threshold=2, reset_timeout=0.2)
+        rest = DocumentREST(self.server.rest_url, self.base, breaker=breaker)
+        self.server.failures = 2
+        self.assertRaises(HTTPError, rest.get, 1)
+        self.assertRaises(HTTPError, rest.get, 1)
+        self.assertEqual(breaker.state, breaker.OPEN)
+        self.assertRaises(CircuitOpenError, rest.get, 1)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(breaker.rejected, 1)
+
+        # A failed trial opens the circuit again
+        time.sleep(0.2)
+        self.assertEqual(breaker.state, breaker.HALF_OPEN)
+        self.server.failures = 1
+        self.assertRaises(HTTPError, rest.get, 1)
+        self.assertRaises(CircuitOpenError, rest.get, 1)
+        time.sleep(0.2)
+        self.assertEqual(rest.get(1).idade, 1)
+        self.assertEqual(breaker.state, breaker.CLOSED)
+
+    def test_circuit_breaker_errors(self):
+        breaker = CircuitBreaker(threshold=1, reset_timeout=0.1)
+        rest = DocumentREST(self.server.rest_url, self.base, breaker=breaker)
+        self.server.failures = 1
+        self.assertRaises(HTTPError, rest.get, 1)
+        time.sleep(0.1)
+
+        # Trial ended by an error not retried
+        session = rest.session
+        request = session.request
+        def redirects(*args, **kwargs):
+            raise TooManyRedirects('Exceeded redirects.')
+        session.request = redirects
+        try:
+            self.assertRaises(TooManyRedirects, rest.get, 1)
+        finally:
+            session.request = request
+        self.assertEqual(breaker.state, breaker.OPEN)
+        self.assertRaises(CircuitOpenError, rest.get, 1)
+        time.sleep(0.1)
+        self.assertEqual(rest.get(1).idade, 1)
+
+        # Trial that never reports back
+        breaker.failure()
+        time.sleep(0.1)
+        breaker.allow()
+        self.assertRaises(CircuitOpenError, breaker.allow)
+        time.sleep(0.1)
+        breaker.allow()
+        self.assertEqual(breaker.state, breaker.HALF_OPEN)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+#!/usr/env python
+# -*- coding: utf-8 -*-
+"""
+In-memory LightBase REST server used by REST client tests.
+"""
+import json
+import time
+import uuid
+import datetime
+import threading
+import email.parser
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlsplit, parse_qs
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlsplit, parse_qs
+
+class ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+class LBServer(object):
+
+    def __init__(self, base):
+        self.base = base
+        self.basename = base.metadata.name
+        self.documents = { }
+        self.files = { }
+        self.next_id = 1
+        # Requests received, as (method, path) tuples
+        self.requests = [ ]
+        # Number of next requests answered with 503
+        self.failures = 0
+        # Seconds to wait before answering
+        self.delay = 0
+        self.lock = threading.Lock()
+        self._version = 0
+        self.server = ThreadingServer(('127.0.0.1', 0), self.handler())
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.rest_url = 'http://127.0.0.1:%d/api' % self.server.server_port
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def timestamp(self):
+        # Distinct for every change
+        self._version += 1
+        return (datetime.datetime(2014, 1, 1) + datetime.timedelta(
+            seconds=self._version)).strftime('%d/%m/%Y %H:%M:%S')
+
+    def add(self, document):
+        with self.lock:
+            id_doc = self.next_id
+            self.next_id += 1
+            now = self.timestamp()
+            document = dict(document, _metadata={'id_doc': id_doc,
+                'dt_doc': now, 'dt_last_up': now})
+            self.documents[id_doc] = document
+            return id_doc
+
+    def handle(self, method, path, query, headers, body):
+        with self.lock:
+            self.requests.append((method, path))
+            failed = self.failures > 0
+            if failed:
+                self.failures -= 1
+        if self.delay:
+            time.sleep(self.delay)
+        if failed:
+            return 503, 'Service unavailable', { }
+        nodes = [node for node in path.split('/')[2:] if node]
+        if nodes == [self.basename] and method == 'GET':
+            return 200, self.base.json, { }
+        if nodes[:2] == [self.basename, 'doc']:
+            return self.handle_doc(method, nodes[2:], query, body)
+        if nodes[:2] == [self.basename, 'file']:
+            return self.handle_file(method, nodes[2:], headers, body)
+        return 404, 'Not found', { }
+
+    def handle_doc(self, method, nodes, query, body):
+        if not nodes:
+            if method == 'POST':
+                return 200, str(self.add(json.loads(parse_qs(body.decode(
+                    'utf-8'))['value'][0]))), { }
+            search = json.loads(query.get('$$', ['{}'])[0])
+            offset = search.get('offset') or 0
+            limit = search.get('limit')
+            with self.lock:
+                documents = [self.documents[id_doc]
+                    for id_doc in sorted(self.documents)]
+            results = documents[offset:None if limit is None
+                else offset + limit]
+            return 200, json.dumps({'results': results,
+                'result_count': len(documents), 'limit': limit,
+                'offset': offset}), { }
+        try:
+            id_doc = int(nodes[0])
+        except ValueError:
+            return 400, 'Invalid id', { }
+        with self.lock:
+            document = self.documents.get(id_doc)
+            if document is None:
+                return 404, 'Document %d not found' % id_doc, { }
+            if method == 'GET':
+                value = document
+                for node in nodes[1:]:
+                    value = value[int(node) if isinstance(value, list)
+                        else node]
+                return 200, json.dumps(value), { }
+            if method == 'PUT' and len(nodes) == 1:
+                value = json.loads(parse_qs(body.decode('utf-8'))['value'][0])
+                metadata = dict(document['_metadata'],
+                    dt_last_up=self.timestamp())
+                self.documents[id_doc] = dict(value, _metadata=metadata)
+                return 200, 'UPDATED', { }
+            if method == 'DELETE' and len(nodes) == 1:
+                del self.documents[id_doc]
+                return 200, 'DELETED', { }
+        return 405, 'Method not allowed', { }
+
+    def handle_file(self, method, nodes, headers, body):
+        if method == 'POST' and not nodes:
+            message = email.parser.BytesParser().parsebytes(
+                ('Content-Type: %s\r\n\r\n' % headers['Content-Type'])
+                .encode('utf-8') + body)
+            for part in message.get_payload():
+                id_file = str(uuid.uuid4())
+                self.files[id_file] = (part.get_filename(),
+                    part.get_payload(decode=True))
+                return 200, id_file, { }
+        if method == 'GET' and len(nodes) == 2 and nodes[1] == 'download':
+            if nodes[0] not in self.files:
+                return 404, 'File not found', { }
+            filename, content = self.files[nodes[0]]
+            return 200, content, {'Content-Type': 'text/plain',
+                'Content-Disposition': 'attachment; filename=%s' % filename}
+        return 405, 'Method not allowed', { }
+
+    def handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            protocol_version = 'HTTP/1.1'
+
+            def respond(self):
+                url = urlsplit(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                status, content, headers = server.handle(self.command,
+                    url.path, parse_qs(url.query), self.headers, body)
+                if not isinstance(content, bytes):
+                    content = content.encode('utf-8')
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_PUT = do_DELETE = respond
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,81 @@
+#!/usr/env python
+# -*- coding: utf-8 -*-
+import json
+import threading
+import unittest
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from liblightbase.lbrest import core
+from liblightbase.lbrest.base import BaseREST
+from liblightbase.lbrest.document import DocumentREST
+from liblightbase.tests.fixtures import field
+from liblightbase.lbutils.conv import dict2base
+
+class Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    connections = set()
+
+    def do_GET(self):
+        Handler.connections.add(self.client_address)
+        body = json.dumps({'path': self.path}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class SessionTestCase(unittest.TestCase):
+    """
+    Test pooled REST sessions
+    """
+
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.rest_url = 'http://127.0.0.1:%d/api' % self.server.server_port
+        Handler.connections = set()
+        core.close_sessions()
+
+    def tearDown(self):
+        core.close_sessions()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_shared_session(self):
+        base = dict2base({'metadata': {'name': 'pessoa'},
+            'content': [field('nome')]})
+        base_rest = BaseREST(self.rest_url)
+        doc_rest = DocumentREST(self.rest_url, base)
+        self.assertIs(base_rest.session, doc_rest.session)
+        self.assertIsNot(base_rest.session,
+            BaseREST('http://127.0.0.1:1/api').session)
+        for i in range(5):
+            self.assertEqual(json.loads(doc_rest.get_path(i, ['nome'])),
+                {'path': '/api/pessoa/doc/%d/nome' % i})
+            base_rest.send_request('GET', ['x'])
+        # Keep-alive: all requests went through a single connection
+        self.assertEqual(len(Handler.connections), 1)
+
+    def test_configure_session(self):
+        old = core.get_session(self.rest_url)
+        session = core.configure_session(self.rest_url, pool_maxsize=2,
+            keep_alive=False)
+        self.assertIsNot(session, old)
+        self.assertIs(BaseREST(self.rest_url).session, session)
+        self.assertEqual(session.headers['Connection'], 'close')
+        adapter = session.get_adapter(self.rest_url)
+        self.assertEqual(adapter._pool_maxsize, 2)
+        for i in range(3):
+            BaseREST(self.rest_url).send_request('GET', ['x'])
+        self.assertEqual(len(Handler.connections), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/env python
+# -*- coding: utf-8 -*-
+import io
+import json
+import datetime
+import unittest
+from liblightbase.lbutils.conv import dict2base
+from liblightbase.lbutils.conv import dict2document
+from liblightbase.lbutils.conv import document2dict
+from liblightbase.lbutils.codecs import DocumentJSONEncoder
+from liblightbase.lbdoc.writer import DocumentWriter
+from liblightbase.tests.fixtures import field
+
+class DocumentWriterTestCase(unittest.TestCase):
+    """
+    Test schema-aware JSON writer
+    """
+
+    def setUp(self):
+        self.base = dict2base({'metadata': {'name': 'evento'}, 'content': [
+            field('nome'),
+            field('quantidade', 'Integer'),
+            field('valor', 'Decimal'),
+            field('ativo', 'Boolean'),
+            field('data', 'Date'),
+            field('hora', 'Time', multivalued=True),
+            field('criado', 'DateTime'),
+            field('extra', 'Json'),
+            {'group': {'metadata': {'name': 'itens', 'alias': 'itens',
+                'description': 'itens', 'multivalued': True}, 'content': [
+                field('descricao'), field('preco', 'Money')]}},
+        ]})
+        self.document = {
+            'nome': u'Concerto "São João" \\ /',
+            'quantidade': 3,
+            'valor': 10.5,
+            'ativo': True,
+            'data': '24/06/2014',
+            'hora': ['10:00:00', '22:30:00'],
+            'criado': '01/05/2014 08:00:01',
+            'extra': {'a': [1, None]},
+            'itens': [{'descricao': 'x', 'preco': 2.0}, {'preco': 1.25}]
+        }
+
+    def dumps(self, document, **kwargs):
+        return json.dumps(document2dict(self.base, document),
+            ensure_ascii=False, cls=DocumentJSONEncoder, **kwargs)
+
+    def test_document2json(self):
+        converter = self.base.converter
+        document = dict2document(self.base, dict(self.document))
+        self.assertEqual(converter.document2json(document),
+            self.dumps(document))
+        dictobj = dict(self.document, data=datetime.date(2014, 6, 24),
+            hora=['10:00:00', datetime.time(22, 30)],
+            criado=datetime.datetime(2014, 5, 1, 8, 0, 1))
+        self.assertEqual(converter.document2json(dictobj),
+            self.dumps(dictobj))
+        self.assertIn('"24/06/2014"', converter.document2json(dictobj))
+        self.assertEqual(converter.document2json(document, (',', ':')),
+            self.dumps(document, separators=(',', ':')))
+        partial = dict2document(self.base, {'nome': None, 'itens': []})
+        self.assertEqual(converter.document2json(partial),
+            '{"nome": null, "itens": []}')
+
+    def test_streams(self):
+        documents = [dict2document(self.base, dict(self.document))] * 3
+        stream = io.StringIO()
+        writer = DocumentWriter(self.base, stream)
+        self.assertFalse(writer.binary)
+        self.assertEqual(writer.write_many(documents), 3)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(lines, [self.dumps(documents[0])] * 3)
+        stream = io.BytesIO()
+        writer = DocumentWriter(self.base, stream)
+        writer.write(documents[0])
+        self.assertEqual(stream.getvalue().decode('utf-8'), lines[0])
+
+if __name__ == '__main__':
+    unittest.main()
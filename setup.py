@@ -21,7 +21,9 @@ LightBase Library""",
           'voluptuous',
           'requests',
           'python-dateutil',
-          'six',
-          'jsonpath-rw'
-      ]
+          'six'
+      ],
+      extras_require={
+          'async': ['aiohttp']
+      }
       )